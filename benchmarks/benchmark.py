@@ -0,0 +1,520 @@
+"""
+Filename: benchmark.py
+Description: This script times each stage of the colortones pipeline
+             on synthetic Chinese corpora of several sizes
+             and saves the results as JSON so that commits can be compared.
+
+             python benchmarks/benchmark.py --output before.json
+             python benchmarks/benchmark.py --compare before.json
+
+Author: TravisGK
+Version: 1.0
+
+License: GNU License
+"""
+
+import argparse
+import gc
+import itertools
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+
+_REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, _REPO_DIR)
+
+import colortones
+from colortones._structure._lexicon import (
+    DEFAULT_LEXICON,
+    _romanize_monophonic,
+    _romanize_with_pypinyin,
+)
+from colortones._structure._paragraph import Clause, Paragraph, Word, split_clauses
+from colortones._structure._segmenter import get_segmenter
+from colortones._structure._phonetics._inflections import (
+    FALLING_INFLECTION,
+    HALF_FALLING_INFLECTION,
+    LOW_INFLECTION,
+    RISING_LOW_INFLECTION,
+)
+from colortones._structure._sequential_rules import (
+    apply_sequential_rule,
+    flatten_words,
+    inflect_bu,
+    inflect_neutrals,
+    inflect_yi,
+    postprocess_flat_inflections,
+)
+from colortones._structure._syllable import _make_syllable
+
+# the words that the synthetic corpora are built from.
+# none of these hold two neutral tones in a row or an unsupported syllable.
+_WORDS = [
+    "你好", "我们", "不要", "一样", "谢谢", "老板", "想买", "哪种", "水果",
+    "听不懂", "打扰", "很高兴", "认识你", "什么", "名字", "今天", "天气",
+    "很好", "明天", "见", "他", "她", "是", "老师", "吃饭", "喝水", "中国",
+    "北京", "我", "你", "去", "来", "看", "书", "电影", "一起", "朋友",
+    "工作", "时候", "怎么", "为什么", "可以", "不能", "一点", "东西",
+    "买", "卖", "小", "大", "一个", "不是", "所以", "已经", "医生", "手表",
+]  # fmt: skip
+_BREAKERS = "，，，；："
+_ENDERS = "。。。？！"
+
+# the number of sentences in each corpus.
+CORPUS_SIZES = {"small": 100, "medium": 1_000, "large": 10_000}
+
+# the number of clauses of each number of words in the long-clause workloads,
+# which give every workload the same total number of words.
+LONG_CLAUSES = {20: 500, 200: 50}
+
+# the number of sentences and the clauses per sentence of the comma-dense
+# workload, whose long sentences of short clauses are costly to join.
+DENSE_SENTENCES = 250
+DENSE_CLAUSES = 40
+
+# a stage that takes longer than this ratio of its old time is a regression.
+DEFAULT_THRESHOLD = 1.10
+
+
+def make_corpus(num_sentences: int, seed: int = 0, num_clauses: tuple = (1, 4)):
+    """
+    Returns a synthetic Chinese text of the given number of sentences,
+    each of which has between the two numbers of clauses (inclusive).
+    The same seed always gives the same text.
+    """
+    rng = random.Random(seed)
+    sentences = []
+    for _ in range(num_sentences):
+        clauses = [
+            "".join(rng.choice(_WORDS) for _ in range(rng.randint(1, 5)))
+            for _ in range(rng.randint(*num_clauses))
+        ]
+        joined = "".join(c + rng.choice(_BREAKERS) for c in clauses[:-1])
+        sentences.append(joined + clauses[-1] + rng.choice(_ENDERS))
+    return "".join(sentences)
+
+
+def _best_time(func, repeat: int, setup=None):
+    """
+    Returns the shortest time in seconds of <repeat> runs of the function.
+    The setup function is called before each run, outside of the timing.
+    """
+    best = None
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        gc.collect()
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def _traced_bytes(func):
+    """Returns the memory that's still allocated by the result of the function."""
+    gc.collect()
+    tracemalloc.start()
+    result = func()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return current
+
+
+def syllable_memory(pairs: list):
+    """
+    Returns the bytes per syllable of a Syllable object for each
+    (hanzi, pinyin) pair, and of a dictionary of every key of the syllable,
+    which is how Syllables were stored before they used slots.
+    """
+    syllables = [_make_syllable(h, p) for h, p in pairs]
+    slotted = _traced_bytes(lambda: [_make_syllable(h, p) for h, p in pairs])
+    dicts = _traced_bytes(lambda: [s.data for s in syllables])
+    return {
+        "slotted_bytes_per_syllable": slotted / len(pairs),
+        "dict_bytes_per_syllable": dicts / len(pairs),
+    }
+
+
+def _time_stages(stages: dict, repeat: int, num_syllables: int):
+    """
+    Returns the seconds and syllables per second of every stage,
+    which is either a function or a tuple of (function, setup function).
+    """
+    results = {}
+    for name, stage in stages.items():
+        func, setup = stage if isinstance(stage, tuple) else (stage, None)
+        seconds = _best_time(func, repeat, setup)
+        results[name] = {
+            "seconds": seconds,
+            "syllables_per_second": num_syllables / seconds if seconds > 0 else None,
+        }
+    return results
+
+
+def _reset_inflections(syllables):
+    for syllable in syllables:
+        tone_num = syllable.transcription.tone_num
+        syllable.inflection_num = syllable._marked_num = tone_num
+
+
+def _apply_five_passes(words: list):
+    """Applies the contextual inflection rules as five passes over the Words."""
+    inflect_yi(words)
+    inflect_bu(words)
+    inflect_neutrals(words)
+    apply_sequential_rule(words, LOW_INFLECTION, RISING_LOW_INFLECTION)
+    apply_sequential_rule(words, FALLING_INFLECTION, HALF_FALLING_INFLECTION)
+
+
+def benchmark_long_clauses(num_words: int, repeat: int = 3, seed: int = 0):
+    """
+    Returns the times of applying the contextual inflection rules
+    to clauses of <num_words> words, both as the fused scan over
+    flat syllables (which Clauses use) and as the five original passes.
+    """
+    rng = random.Random(seed)
+    clauses = [
+        [Word(rng.choice(_WORDS)) for _ in range(num_words)]
+        for _ in range(LONG_CLAUSES[num_words])
+    ]
+    flat_clauses = [flatten_words(words) for words in clauses]
+    all_syllables = [s for syllables, _ in flat_clauses for s in syllables]
+
+    def apply_fused_scan():
+        for syllables, word_starts in flat_clauses:
+            postprocess_flat_inflections(syllables, word_starts)
+
+    def apply_five_passes():
+        for words in clauses:
+            _apply_five_passes(words)
+
+    def reset():
+        _reset_inflections(all_syllables)
+
+    stages = {
+        "fused-scan": (apply_fused_scan, reset),
+        "five-passes": (apply_five_passes, reset),
+    }
+    return {
+        "num_syllables": len(all_syllables),
+        "stages": _time_stages(stages, repeat, len(all_syllables)),
+    }
+
+
+def benchmark_comma_dense(repeat: int = 3, seed: int = 0):
+    """
+    Returns the times of joining and processing a text whose sentences
+    are each made of DENSE_CLAUSES clauses split by commas and semicolons.
+    """
+    text_str = make_corpus(DENSE_SENTENCES, seed, (DENSE_CLAUSES, DENSE_CLAUSES))
+    clauses = [Clause(c) for c in split_clauses(text_str)]
+    clauses = [c for c in clauses if len(c) > 0]
+    num_syllables = Paragraph(text_str).num_syllables()
+
+    stages = {
+        "joining": lambda: Paragraph._join_clauses(clauses),
+        "process-text": lambda: colortones.process_text(text_str),
+    }
+    return {
+        "num_syllables": num_syllables,
+        "stages": _time_stages(stages, repeat, num_syllables),
+    }
+
+
+def benchmark_text(text_str: str, scheme, repeat: int = 3):
+    """
+    Returns a dictionary of the seconds and syllables per second
+    of every stage of processing and rendering the text,
+    along with its number of syllables and the peak memory of processing.
+    """
+    lexicon = DEFAULT_LEXICON
+    clause_strs = split_clauses(text_str)
+    word_strs = [w for c in clause_strs for w in lexicon.segment(c)]
+    pinyins = [lexicon.romanize(w) for w in word_strs]
+    pairs = [
+        (w[i], p[i][0])
+        for w, p in zip(word_strs, pinyins)
+        for i in range(len(w))
+        if len(p) > 1 or p[0][0] != " "
+    ]
+
+    clauses = [Clause(c) for c in clause_strs]
+    clauses = [c for c in clauses if len(c) > 0]
+    flat_clauses = [flatten_words(c.words) for c in clauses]
+    paragraph = Paragraph(text_str)
+    num_syllables = paragraph.num_syllables()
+
+    def reset_inflections():
+        for syllables, _ in flat_clauses:
+            _reset_inflections(syllables)
+
+    def apply_rules():
+        for syllables, word_starts in flat_clauses:
+            postprocess_flat_inflections(syllables, word_starts)
+
+    max_match = get_segmenter("max-match")
+    max_match.load()
+
+    stages = {
+        "segmentation": lambda: [lexicon.segment(c) for c in clause_strs],
+        "max-match-segment": lambda: [max_match.segment(c) for c in clause_strs],
+        "romanization": lambda: [lexicon.romanize(w) for w in word_strs],
+        "pypinyin-only": lambda: [_romanize_with_pypinyin(w) for w in word_strs],
+        "syllables": lambda: [_make_syllable(h, p) for h, p in pairs],
+        "inflection-rules": (apply_rules, reset_inflections),
+        "joining": lambda: Paragraph._join_clauses(clauses),
+        "render-hanzi": lambda: paragraph.to_color_str("hanzi", scheme),
+        "render-pinyin": lambda: paragraph.to_color_str("pinyin", scheme),
+        "render-html": lambda: paragraph.to_html(scheme),
+        "process-text": lambda: colortones.process_text(text_str),
+    }
+
+    results = _time_stages(stages, repeat, num_syllables)
+
+    gc.collect()
+    tracemalloc.start()
+    colortones.process_text(text_str)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "num_syllables": num_syllables,
+        "peak_memory_bytes": peak,
+        "syllable_memory": syllable_memory(pairs),
+        "stages": results,
+    }
+
+
+def verify_romanization(word_strs):
+    """
+    Compares the pinyin of every character and of every given word
+    that's romanized without pypinyin with pypinyin's own pinyin.
+    Returns a list of (word, pinyin, pypinyin's pinyin) of each disagreement.
+    """
+    chars = (chr(code) for code in range(0x30000) if not 0xD800 <= code < 0xE000)
+    disagreements = []
+    for word_str in itertools.chain(chars, dict.fromkeys(word_strs)):
+        p = _romanize_monophonic(word_str)
+        if p is None:
+            continue  # pypinyin is used anyway.
+        expected = _romanize_with_pypinyin(word_str)
+        if p != expected:
+            disagreements.append((word_str, p, expected))
+    return disagreements
+
+
+def _get_commit():
+    """Returns the current git commit of the repository, if there is one."""
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=_REPO_DIR,
+            capture_output=True,
+            text=True,
+        )
+    except OSError:
+        return None
+    return result.stdout.strip() or None
+
+
+def _get_version(package: str):
+    from importlib import metadata
+
+    try:
+        return metadata.version(package)
+    except metadata.PackageNotFoundError:
+        return None
+
+
+def run_benchmarks(sizes: list, repeat: int = 3, seed: int = 0):
+    """Returns the results of benchmarking a corpus of each of the sizes."""
+    start = time.perf_counter()
+    colortones.warmup()
+    warmup_seconds = time.perf_counter() - start
+
+    scheme = colortones.load_color_scheme("default", color_mode="ansi")
+    results = {
+        "meta": {
+            "commit": _get_commit(),
+            "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "jieba": _get_version("jieba"),
+            "pypinyin": _get_version("pypinyin"),
+            "repeat": repeat,
+            "seed": seed,
+            "warmup_seconds": warmup_seconds,
+        },
+        "corpora": {},
+        "workloads": {},
+    }
+    for size in sizes:
+        text_str = make_corpus(CORPUS_SIZES[size], seed)
+        results["corpora"][size] = benchmark_text(text_str, scheme, repeat)
+
+    # workloads that single out the cases particular stages were optimized for.
+    workloads = results["workloads"]
+    for num_words in LONG_CLAUSES.keys():
+        workloads[f"clauses of {num_words} words"] = benchmark_long_clauses(
+            num_words, repeat, seed
+        )
+    workloads["comma-dense text"] = benchmark_comma_dense(repeat, seed)
+    return results
+
+
+def _print_stages(stages: dict):
+    for name, stage in stages.items():
+        rate = stage["syllables_per_second"] or 0
+        print(
+            f"  {name:<18}{stage['seconds'] * 1e3:>10.1f} ms"
+            f"{rate:>14,.0f} syllables/s"
+        )
+
+
+def print_results(results: dict):
+    for size, corpus in results["corpora"].items():
+        peak_mb = corpus["peak_memory_bytes"] / 1e6
+        print(
+            f"\n{size}: {corpus['num_syllables']:,} syllables, "
+            f"peak memory {peak_mb:.1f} MB"
+        )
+        memory = corpus["syllable_memory"]
+        print(
+            f"  {'bytes/syllable':<18}{memory['slotted_bytes_per_syllable']:>10.0f}"
+            f" (a dict per syllable: {memory['dict_bytes_per_syllable']:.0f})"
+        )
+        _print_stages(corpus["stages"])
+
+    for name, workload in results.get("workloads", {}).items():
+        print(f"\n{name}: {workload['num_syllables']:,} syllables")
+        _print_stages(workload["stages"])
+
+
+def _compare_stages(label, stages: dict, old_stages: dict, threshold: float):
+    """
+    Prints the ratio of the new time to the old time of every stage
+    and returns the list of (label, stage) that got slower than the threshold.
+    """
+    regressions = []
+    for name, stage in stages.items():
+        old_stage = old_stages.get(name)
+        if old_stage is None:
+            continue
+        ratio = stage["seconds"] / old_stage["seconds"]
+        flag = ""
+        if ratio > threshold:
+            flag = "  <-- slower"
+            regressions.append((label, name))
+        print(f"  {name:<18}{ratio:>8.2f}x{flag}")
+    return regressions
+
+
+def compare_results(old: dict, new: dict, threshold: float = DEFAULT_THRESHOLD):
+    """
+    Prints the ratio of the new time to the old time of every stage
+    and returns the list of (corpus, stage) that got slower than the threshold.
+    """
+    regressions = []
+    print(f"\ncompared with {old['meta'].get('commit')} ({old['meta'].get('date')})")
+    for size, corpus in new["corpora"].items():
+        old_corpus = old["corpora"].get(size)
+        if old_corpus is None:
+            continue
+        print(f"\n{size}:")
+        regressions += _compare_stages(
+            size, corpus["stages"], old_corpus["stages"], threshold
+        )
+
+        old_peak = old_corpus["peak_memory_bytes"]
+        ratio = corpus["peak_memory_bytes"] / old_peak
+        flag = ""
+        if ratio > threshold:
+            flag = "  <-- larger"
+            regressions.append((size, "peak-memory"))
+        print(f"  {'peak-memory':<18}{ratio:>8.2f}x{flag}")
+
+        old_memory = old_corpus.get("syllable_memory")
+        if old_memory is not None:
+            key = "slotted_bytes_per_syllable"
+            ratio = corpus["syllable_memory"][key] / old_memory[key]
+            flag = ""
+            if ratio > threshold:
+                flag = "  <-- larger"
+                regressions.append((size, "bytes-per-syllable"))
+            print(f"  {'bytes/syllable':<18}{ratio:>8.2f}x{flag}")
+
+    old_workloads = old.get("workloads", {})
+    for name, workload in new.get("workloads", {}).items():
+        old_workload = old_workloads.get(name)
+        if old_workload is None:
+            continue
+        print(f"\n{name}:")
+        regressions += _compare_stages(
+            name, workload["stages"], old_workload["stages"], threshold
+        )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--sizes",
+        nargs="+",
+        choices=list(CORPUS_SIZES.keys()),
+        default=list(CORPUS_SIZES.keys()),
+        help="the corpora to benchmark",
+    )
+    parser.add_argument("--repeat", type=int, default=3, help="runs per stage")
+    parser.add_argument("--seed", type=int, default=0, help="the corpus seed")
+    parser.add_argument("--output", help="saves the results to this JSON file")
+    parser.add_argument("--compare", help="compares with the results in a JSON file")
+    parser.add_argument(
+        "--verify",
+        action="store_true",
+        help="checks that romanization agrees with pypinyin and exits",
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help="the ratio of old times past which a stage is a regression",
+    )
+    args = parser.parse_args()
+
+    if args.verify:
+        word_strs = [
+            w
+            for size in args.sizes
+            for c in split_clauses(make_corpus(CORPUS_SIZES[size], args.seed))
+            for w in DEFAULT_LEXICON.segment(c)
+        ]
+        disagreements = verify_romanization(word_strs)
+        for word_str, p, expected in disagreements[:20]:
+            print(f"{word_str}: {p} != {expected}")
+        print(f"{len(disagreements)} disagreements with pypinyin")
+        sys.exit(1 if len(disagreements) > 0 else 0)
+
+    results = run_benchmarks(args.sizes, args.repeat, args.seed)
+    print_results(results)
+
+    if args.output is not None:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(results, file, indent=2)
+
+    if args.compare is not None:
+        with open(args.compare, "r", encoding="utf-8") as file:
+            old = json.load(file)
+        regressions = compare_results(old, results, args.threshold)
+        if len(regressions) > 0:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -10,11 +10,205 @@ License: GNU License
 
 import json
 import os
-from ._structure._paragraph import Paragraph
-from ._themes._color_scheme import load_color_scheme
+from ._structure._annotation_cache import AnnotationCache
+from ._structure._lexicon import DEFAULT_LEXICON, BatchLexicon, Lexicon, warmup
+from ._structure._paragraph import Paragraph, load_paragraph, split_clauses
+from ._structure._segmenter import (
+    CharacterSegmenter,
+    JiebaSegmenter,
+    MaxMatchSegmenter,
+    Segmenter,
+    get_segmenter,
+)
+from ._structure._stream import DEFAULT_CHUNK_SIZE, iter_sentences
+from ._structure._stats import disable_stats, enable_stats, reset_stats, stats
+from ._structure._syllable import (
+    clear_syllable_cache,
+    set_syllable_cache_size,
+    syllable_cache_info,
+)
+from ._themes._color_scheme import (
+    add_color_scheme_file,
+    detect_color_mode,
+    load_color_scheme,
+    register_color_scheme,
+    reload_color_schemes,
+)
+from ._themes._html import write_html, write_svg
 
 
-def process_text(text_str: str):
+def _normalize_text(text_str: str):
+    """Returns the text as a single stripped line."""
     text_str = text_str.replace("\n", " ")
-    text_str = text_str.strip()
-    return Paragraph(text_str)
+    return text_str.strip()
+
+
+def process_text(
+    text_str: str,
+    workers: int = 1,
+    columnar: bool = False,
+    cache: AnnotationCache = None,
+    segmenter=None,
+):
+    """
+    Returns a Paragraph of the given text.
+
+    Parameters:
+    text_str (str): the Chinese text to process.
+    workers (int): if greater than 1, the clauses are annotated
+                   across this many worker processes.
+                   The result is identical to the serial result.
+    columnar (bool): if True, the Paragraph keeps its syllables in arrays,
+                     which can be exported with Paragraph.to_arrays().
+    cache (AnnotationCache): if given, clauses are read from it when possible
+                             and newly annotated clauses are written to it.
+                             With several workers, only the missing clauses
+                             are sent to the workers.
+    segmenter: splits clauses into words; either a Segmenter or
+               "jieba" (the default and most accurate),
+               "max-match" (much faster, and nearly always the same words)
+               or "character" (fastest, but polyphones are often misread).
+    """
+    text_str = _normalize_text(text_str)
+    if workers > 1:
+        # the worker processes are only set up once they're used.
+        from ._structure._parallel import annotate_clause_strs_in_parallel
+
+        clause_strs = split_clauses(text_str)
+        clauses = annotate_clause_strs_in_parallel(
+            clause_strs, workers, segmenter, cache
+        )
+        if cache is not None:
+            cache.flush()
+        return Paragraph._from_annotated(text_str, clause_strs, clauses, columnar)
+
+    lexicon = Lexicon(segmenter)
+    paragraph = Paragraph(text_str, lexicon, columnar=columnar, cache=cache)
+    if cache is not None:
+        cache.flush()
+    return paragraph
+
+
+async def aprocess_text(
+    text_str: str,
+    columnar: bool = False,
+    cache: AnnotationCache = None,
+    segmenter=None,
+):
+    """
+    Returns a Paragraph of the given text like process_text,
+    without blocking the event loop.
+
+    The clauses are annotated in small batches on a shared thread pool,
+    so the job can be cancelled between batches,
+    and only a few texts are annotated at once (see set_max_jobs).
+    The parameters are the same as those of process_text.
+    """
+    # asyncio takes a while to import, so it's only imported once it's used.
+    from ._structure._async import annotate_text_async
+
+    text_str = _normalize_text(text_str)
+    lexicon = Lexicon(segmenter)
+    return await annotate_text_async(text_str, lexicon, columnar, cache)
+
+
+async def aiter_sentences(
+    source,
+    lexicon=DEFAULT_LEXICON,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    cache: AnnotationCache = None,
+):
+    """
+    Yields the sentences (Clause objects) of the text as soon as
+    they are finished, like iter_sentences, without blocking the event loop.
+    Control is given back to the event loop after every sentence.
+
+    Parameters:
+    source: a string, a text file object, an iterable of strings,
+            or an async iterable of strings or UTF-8 bytes
+            (such as the content of an aiohttp request).
+    lexicon (Lexicon): segments and romanizes the clauses.
+    chunk_size (int): the number of characters read at a time from a file.
+    cache (AnnotationCache): if given, clauses are read from and added to it.
+
+    Returns:
+    async generator: the same sentences that process_text would give.
+    """
+    from ._structure import _async
+
+    async for sentence in _async.aiter_sentences(source, lexicon, chunk_size, cache):
+        yield sentence
+
+
+def set_max_jobs(max_jobs: int):
+    """
+    Sets the greatest number of texts that are annotated at once
+    by aprocess_text and aiter_sentences. Any more wait their turn,
+    which keeps each job from being slowed down by all the others.
+    """
+    from ._structure import _async
+
+    _async.set_max_jobs(max_jobs)
+
+
+def annotate_clauses_in_parallel(text_str: str, workers: int, segmenter=None):
+    """
+    Returns the list of inflected Clauses in the text,
+    annotated across the given number of worker processes.
+    """
+    from ._structure import _parallel
+
+    return _parallel.annotate_clauses_in_parallel(text_str, workers, segmenter)
+
+
+def shutdown_workers():
+    """Shuts down the worker processes used for parallel annotation."""
+    from ._structure import _parallel
+
+    _parallel.shutdown_workers()
+
+
+def process_many(
+    texts,
+    columnar: bool = False,
+    cache: AnnotationCache = None,
+    segmenter=None,
+):
+    """
+    Returns a list of Paragraphs, one for each string in <texts>.
+
+    All of the clauses are segmented together up front
+    and every distinct word is only romanized once,
+    which is much faster than calling process_text on each string
+    when there are many short texts with repeated words.
+    If an AnnotationCache is given, only the clauses missing from it
+    are segmented and annotated.
+    The segmenter is chosen as in process_text.
+    """
+    text_strs = [_normalize_text(text_str) for text_str in texts]
+    clause_strs = (c for t in text_strs for c in split_clauses(t))
+    segmenter = get_segmenter(segmenter)
+    if cache is not None:
+        clause_strs = cache.missing(clause_strs, segmenter.name)
+    lexicon = BatchLexicon(clause_strs, segmenter)
+    paragraphs = [
+        Paragraph(text_str, lexicon, columnar=columnar, cache=cache)
+        for text_str in text_strs
+    ]
+    if cache is not None:
+        cache.flush()
+    return paragraphs
+
+
+def load(path: str, mmap: bool = True):
+    """
+    Returns the Paragraph that was saved to the file with Paragraph.save.
+    Its syllables are kept in columns, so it can be rendered
+    without segmenting or annotating the text again.
+
+    Parameters:
+    path (str): the path of the saved file.
+    mmap (bool): if True, the file is memory-mapped instead of read,
+                 so its columns aren't copied into memory.
+    """
+    return load_paragraph(path, use_mmap=mmap)
@@ -0,0 +1,286 @@
+"""
+Filename: _annotation_cache.py
+Description: This file contains a class definition for the AnnotationCache,
+             which keeps the annotated syllables of clauses in an SQLite file
+             so that repeated clauses needn't be annotated again.
+
+Author: TravisGK
+Version: 1.0
+
+License: GNU License
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from ._disk_cache import cache_dir
+
+# bump this whenever the layout of a cached clause changes.
+_CACHE_FORMAT = 1
+
+# the default greatest number of clauses kept in the cache.
+DEFAULT_MAX_ENTRIES = 200_000
+
+# the number of new clauses held in memory before they're written.
+_FLUSH_SIZE = 1000
+
+# the number of read clauses held in memory before they're marked as used.
+_READ_SIZE = 10_000
+
+# the number of clauses looked up by a single query.
+_QUERY_SIZE = 500
+
+_STRUCTURE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# the files whose contents decide how a clause is annotated.
+_SOURCE_FILES = [
+    "_lexicon.py",
+    "_paragraph.py",
+    "_segmenter.py",
+    "_sequential_rules.py",
+    "_syllable.py",
+    os.path.join("_phonetics", "_inflections.py"),
+    os.path.join("_phonetics", "_tones.py"),
+    os.path.join("_phonetics", "_transcription.py"),
+    os.path.join("_phonetics", "res", "_tones.json"),
+    os.path.join("_phonetics", "res", "_transcription.json"),
+]
+
+
+def _to_rows(words: list):
+    """
+    Returns the (hanzi, pinyin, inflection number, tone mark number)
+    of every syllable of the words, as they're kept in the cache.
+    """
+    return [
+        [
+            [s.hanzi, s.transcription.pinyin, s.inflection_num, s._marked_num]
+            for s in word
+        ]
+        for word in words
+    ]
+
+
+def _get_version_stamp():
+    """
+    Returns a hash of the annotation rules, their data files
+    and the versions of jieba and pypinyin.
+    Cached clauses are dropped whenever this changes.
+    """
+    from importlib import metadata
+
+    digest = hashlib.sha256(str(_CACHE_FORMAT).encode())
+    for name in _SOURCE_FILES:
+        with open(os.path.join(_STRUCTURE_DIR, name), "rb") as file:
+            digest.update(file.read())
+    for package in ["jieba", "pypinyin"]:
+        try:
+            digest.update(metadata.version(package).encode())
+        except metadata.PackageNotFoundError:
+            digest.update(b"?")
+    return digest.hexdigest()
+
+
+def _hash_clause(clause_str: str, segmenter: str):
+    key_str = segmenter + "\0" + clause_str
+    return hashlib.blake2b(key_str.encode(), digest_size=16).digest()
+
+
+class AnnotationCache:
+    """
+    An AnnotationCache binds the hash of each clause string
+    (along with the name of the segmenter that split it) to the words
+    of its annotated syllables, which are stored as lists of
+    (hanzi, pinyin, inflection number, tone mark number) in an SQLite file.
+
+    New clauses are written in batches, so flush() or close()
+    should be called once the cache is no longer being added to.
+    When the cache holds more than <max_entries> clauses,
+    the least recently used clauses are removed.
+    A single AnnotationCache can be shared between threads.
+    """
+
+    def __init__(self, path: str = None, max_entries: int = DEFAULT_MAX_ENTRIES):
+        """
+        Opens the cache at the path, which is "annotations.sqlite3"
+        in the colortones cache directory by default.
+        If the cache directory is disabled, the cache is kept in memory.
+        """
+        # sqlite3 is only imported once a cache is used,
+        # so that it doesn't slow down importing colortones.
+        import sqlite3
+
+        if path is None:
+            directory = cache_dir()
+            if directory is None:
+                path = ":memory:"
+            else:
+                os.makedirs(directory, exist_ok=True)
+                path = os.path.join(directory, "annotations.sqlite3")
+
+        self.path = path
+        self.max_entries = max_entries
+        self._new_rows = {}
+        self._read_rows = {}
+        self._lock = threading.RLock()
+
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._connection as c:
+            c.execute("PRAGMA journal_mode=WAL")
+            c.execute("PRAGMA synchronous=NORMAL")
+            c.execute("CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value)")
+            c.execute(
+                "CREATE TABLE IF NOT EXISTS clauses "
+                "(key BLOB PRIMARY KEY, words TEXT, used INTEGER)"
+            )
+            c.execute("CREATE INDEX IF NOT EXISTS clauses_used ON clauses (used)")
+
+            # drops every clause that was annotated by other rules.
+            stamp = _get_version_stamp()
+            query = "SELECT value FROM meta WHERE name='version'"
+            row = c.execute(query).fetchone()
+            if row is None or row[0] != stamp:
+                c.execute("DELETE FROM clauses")
+                query = "INSERT OR REPLACE INTO meta VALUES ('version', ?)"
+                c.execute(query, (stamp,))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __len__(self):
+        """Returns the number of clauses that have been written."""
+        query = "SELECT COUNT(*) FROM clauses"
+        with self._lock:
+            return self._connection.execute(query).fetchone()[0]
+
+    def __contains__(self, clause_str: str):
+        return len(self.missing([clause_str])) == 0
+
+    def missing(self, clause_strs, segmenter: str = "jieba"):
+        """
+        Returns a list of the given clause strings that aren't cached
+        for the segmenter of the given name.
+        The cached clauses are read in bulk and kept until the next flush(),
+        so that get() can return them without another query.
+        """
+        with self._lock:
+            return self._missing(clause_strs, segmenter)
+
+    def _missing(self, clause_strs, segmenter: str):
+        keys = {}
+        for clause_str in clause_strs:
+            key = _hash_clause(clause_str, segmenter)
+            if key not in self._new_rows and key not in self._read_rows:
+                keys.setdefault(key, []).append(clause_str)
+
+        key_list = list(keys.keys())
+        for i in range(0, len(key_list), _QUERY_SIZE):
+            batch = key_list[i : i + _QUERY_SIZE]
+            query = "SELECT key, words FROM clauses WHERE key IN ({})".format(
+                ",".join("?" * len(batch))
+            )
+            for key, words_json in self._connection.execute(query, batch):
+                self._read_rows[key] = json.loads(words_json)
+                del keys[key]
+        return [clause_str for strs in keys.values() for clause_str in strs]
+
+    def get(self, clause_str: str, segmenter: str = "jieba"):
+        """
+        Returns a list that holds a list of
+        (hanzi, pinyin, inflection number, tone mark number)
+        for each word of the clause as split by the segmenter of the given name,
+        or None if it isn't cached.
+        """
+        with self._lock:
+            return self._get(_hash_clause(clause_str, segmenter))
+
+    def _get(self, key: bytes):
+        rows = self._read_rows.get(key)
+        if rows is None:
+            rows = self._new_rows.get(key)
+        if rows is None:
+            query = "SELECT words FROM clauses WHERE key=?"
+            row = self._connection.execute(query, (key,)).fetchone()
+            if row is None:
+                return None
+            rows = json.loads(row[0])
+            self._read_rows[key] = rows
+            if len(self._read_rows) >= _READ_SIZE:
+                self.flush()
+        return rows
+
+    def put(self, clause_str: str, words: list, segmenter: str = "jieba"):
+        """
+        Caches the words of the clause as split by the segmenter
+        of the given name, given as a list of lists of Syllable objects.
+        """
+        rows = _to_rows(words)
+        with self._lock:
+            self._new_rows[_hash_clause(clause_str, segmenter)] = rows
+            if len(self._new_rows) >= _FLUSH_SIZE:
+                self.flush()
+
+    def flush(self):
+        """
+        Writes the new clauses to the file, marks the clauses that were read
+        as recently used and removes the least recently used clauses
+        if there are too many.
+        """
+        with self._lock:
+            self._flush()
+
+    def _flush(self):
+        if len(self._new_rows) == 0 and len(self._read_rows) == 0:
+            return
+
+        now = time.time_ns()
+        with self._connection as c:
+            c.executemany(
+                "UPDATE clauses SET used=? WHERE key=?",
+                [(now, key) for key in self._read_rows.keys()],
+            )
+            c.executemany(
+                "INSERT OR REPLACE INTO clauses VALUES (?, ?, ?)",
+                [
+                    (key, json.dumps(rows, ensure_ascii=False), now)
+                    for key, rows in self._new_rows.items()
+                ],
+            )
+            if len(self._new_rows) > 0:
+                self._evict(c)
+        self._new_rows.clear()
+        self._read_rows.clear()
+
+    def _evict(self, c):
+        """Removes the least recently used clauses past <max_entries>."""
+        num_entries = c.execute("SELECT COUNT(*) FROM clauses").fetchone()[0]
+        if num_entries <= self.max_entries:
+            return
+
+        # removes a tenth more than needed, so eviction doesn't run every time.
+        num_removed = num_entries - self.max_entries + self.max_entries // 10
+        c.execute(
+            "DELETE FROM clauses WHERE key IN "
+            "(SELECT key FROM clauses ORDER BY used LIMIT ?)",
+            (num_removed,),
+        )
+
+    def clear(self):
+        """Removes every cached clause."""
+        with self._lock, self._connection as c:
+            self._new_rows.clear()
+            self._read_rows.clear()
+            c.execute("DELETE FROM clauses")
+
+    def close(self):
+        """Writes any new clauses and closes the file."""
+        with self._lock:
+            if self._connection is not None:
+                self._flush()
+                self._connection.close()
+                self._connection = None
@@ -0,0 +1,187 @@
+"""
+Filename: _async.py
+Description: This file contains functionality to annotate text from asyncio
+             without blocking the event loop, running the work in batches
+             on a shared thread pool and limiting how many texts
+             are annotated at once.
+
+Author: TravisGK
+Version: 1.0
+
+License: GNU License
+"""
+
+import asyncio
+import codecs
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from . import _paragraph
+from ._lexicon import DEFAULT_LEXICON
+from ._paragraph import Paragraph, split_clauses
+from ._stream import DEFAULT_CHUNK_SIZE, _TextCutter
+
+# the default greatest number of texts that are annotated at once.
+DEFAULT_MAX_JOBS = 2
+
+# the number of clauses annotated in a single call to the thread pool.
+# a job can only be cancelled between these batches.
+_CLAUSES_PER_BATCH = 64
+
+_max_jobs = DEFAULT_MAX_JOBS
+_executor = None
+
+# binds each event loop to the semaphore that limits its jobs.
+_semaphores = weakref.WeakKeyDictionary()
+
+
+def set_max_jobs(max_jobs: int):
+    """
+    Sets the greatest number of texts that are annotated at once
+    by aprocess_text and aiter_sentences. Any more wait their turn,
+    which keeps each job from being slowed down by all the others.
+    """
+    global _max_jobs, _executor
+    if max_jobs < 1:
+        raise ValueError(f"max_jobs must be at least 1, not {max_jobs}.")
+
+    _max_jobs = max_jobs
+    _semaphores.clear()
+    if _executor is not None:
+        _executor.shutdown(wait=False)
+        _executor = None
+
+
+def _get_executor():
+    """Returns the thread pool that annotates the text."""
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=_max_jobs,
+            thread_name_prefix="colortones",
+        )
+    return _executor
+
+
+def _get_semaphore():
+    """Returns the semaphore that limits the jobs of the running event loop."""
+    loop = asyncio.get_running_loop()
+    semaphore = _semaphores.get(loop)
+    if semaphore is None:
+        semaphore = asyncio.Semaphore(_max_jobs)
+        _semaphores[loop] = semaphore
+    return semaphore
+
+
+async def _run(func, *args):
+    """Returns the result of the function after running it in the thread pool."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_executor(), func, *args)
+
+
+async def _annotate(text_str: str, lexicon, columnar: bool, cache):
+    """
+    Returns the Paragraph of the text, annotating its clauses in batches
+    so that the event loop can cancel the job between them.
+    """
+    async with _get_semaphore():
+        clause_strs = await _run(split_clauses, text_str)
+        clauses = []
+        for start in range(0, len(clause_strs), _CLAUSES_PER_BATCH):
+            batch = clause_strs[start : start + _CLAUSES_PER_BATCH]
+            # looked up on each call, so that it's timed while stats are enabled.
+            annotate = _paragraph._annotate_clause_strs
+            clauses.extend(await _run(annotate, batch, lexicon, cache))
+        return await _run(
+            Paragraph._from_annotated, text_str, clause_strs, clauses, columnar
+        )
+
+
+async def annotate_text_async(
+    text_str: str,
+    lexicon=DEFAULT_LEXICON,
+    columnar: bool = False,
+    cache=None,
+):
+    """Returns the Paragraph of the text without blocking the event loop."""
+    paragraph = await _annotate(text_str, lexicon, columnar, cache)
+    if cache is not None:
+        await _run(cache.flush)
+    return paragraph
+
+
+async def _aiter_chunks(source, chunk_size: int):
+    """
+    Yields strings from a string, an async iterable,
+    a text file object (read in another thread) or an iterable.
+    Chunks of bytes are decoded as UTF-8.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")()
+
+    def decode(chunk):
+        return decoder.decode(chunk) if isinstance(chunk, bytes) else chunk
+
+    if isinstance(source, (str, bytes)):
+        yield decode(source)
+    elif hasattr(source, "__aiter__"):
+        async for chunk in source:
+            yield decode(chunk)
+    elif hasattr(source, "read"):
+        loop = asyncio.get_running_loop()
+        while True:
+            chunk = await loop.run_in_executor(None, source.read, chunk_size)
+            if len(chunk) == 0:
+                break
+            yield decode(chunk)
+    else:
+        for chunk in source:
+            yield decode(chunk)
+            await asyncio.sleep(0)
+
+    rest = decoder.decode(b"", final=True)
+    if len(rest) > 0:
+        yield rest
+
+
+async def _aiter_text_strs(source, chunk_size: int):
+    """Yields the text of the source in pieces that can be annotated alone."""
+    cutter = _TextCutter()
+    async for chunk in _aiter_chunks(source, chunk_size):
+        text_str = cutter.feed(chunk)
+        if text_str is not None:
+            yield text_str
+
+    text_str = cutter.finish()
+    if text_str is not None:
+        yield text_str
+
+
+async def aiter_sentences(
+    source,
+    lexicon=DEFAULT_LEXICON,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    cache=None,
+):
+    """
+    Yields the sentences (Clause objects) of the text as soon as
+    they are finished, like iter_sentences, without blocking the event loop.
+    Control is given back to the event loop after every sentence.
+
+    Parameters:
+    source: a string, a text file object, an iterable of strings,
+            or an async iterable of strings or UTF-8 bytes
+            (such as the content of an aiohttp request).
+    lexicon (Lexicon): segments and romanizes the clauses.
+    chunk_size (int): the number of characters read at a time from a file.
+    cache (AnnotationCache): if given, clauses are read from and added to it.
+
+    Returns:
+    async generator: the same sentences that process_text would give.
+    """
+    async for text_str in _aiter_text_strs(source, chunk_size):
+        paragraph = await _annotate(text_str, lexicon, False, cache)
+        for sentence in paragraph:
+            yield sentence
+            await asyncio.sleep(0)
+
+    if cache is not None:
+        await _run(cache.flush)
@@ -0,0 +1,210 @@
+"""
+Filename: _columns.py
+Description: This file contains a class definition for SyllableColumns,
+             which store the syllables of a Paragraph as flat arrays.
+
+Author: TravisGK
+Version: 1.0
+
+License: GNU License
+"""
+
+import json
+import struct
+import sys
+from array import array
+from ._syllable import _restore_syllable
+
+# the typecodes of the arrays.
+# tone numbers fit in a signed byte and every index fits in 32 bits.
+TONE_TYPECODE = "b"
+INDEX_TYPECODE = "I"
+
+# the start of every file written by write_columns.
+_MAGIC = b"CTONES\0\0"
+_FORMAT_VERSION = 1
+
+# the magic bytes, the format version and the size of the JSON header.
+_PREAMBLE = struct.Struct("<8sII")
+
+# every section of a file starts at a multiple of this many bytes.
+_ALIGNMENT = 8
+
+# the names of the columns that have one entry per syllable.
+SYLLABLE_COLUMNS = [
+    "hanzi",
+    "pinyin",
+    "inflection-num",
+    "spoken-tone-num",
+    "innate-tone-num",
+    "tone-mark-num",
+]
+
+
+class SyllableColumns:
+    """
+    SyllableColumns hold every syllable of a Paragraph in parallel arrays:
+        - "hanzi" and "pinyin" hold indices into the <strings> table.
+        - "inflection-num", "spoken-tone-num" and "innate-tone-num"
+          hold the tone numbers of each syllable.
+        - "tone-mark-num" holds the inflection that
+          the syllable's zhuyin and IPA tone marks are written for.
+        - "word-offsets" holds the index of the first syllable of each word,
+          followed by the total number of syllables.
+        - "sentence-offsets" holds the index of the first word
+          of each sentence, followed by the total number of words.
+    """
+
+    def __init__(self, strings: list, columns: dict):
+        self.strings = strings
+        self.columns = columns
+
+    def __len__(self):
+        """Returns the number of sentences."""
+        return len(self.columns["sentence-offsets"]) - 1
+
+    def num_syllables(self):
+        return len(self.columns["hanzi"])
+
+    def to_arrays(self):
+        """
+        Returns a dictionary of memoryviews of every column,
+        along with the "strings" table, without copying any of the arrays.
+        """
+        result = {name: memoryview(col) for name, col in self.columns.items()}
+        result["strings"] = self.strings
+        return result
+
+    def iter_syllables(self, start: int, end: int):
+        """Yields new Syllable objects for the given range of syllables."""
+        strings = self.strings
+        hanzi = self.columns["hanzi"]
+        pinyin = self.columns["pinyin"]
+        inflection_nums = self.columns["inflection-num"]
+        mark_nums = self.columns["tone-mark-num"]
+        for i in range(start, end):
+            yield _restore_syllable(
+                strings[hanzi[i]],
+                strings[pinyin[i]],
+                inflection_nums[i],
+                mark_nums[i],
+            )
+
+
+def build_columns(sentences):
+    """Returns SyllableColumns holding the given list of Clauses."""
+    strings = []
+    string_ids = {}
+
+    def intern(string):
+        index = string_ids.get(string)
+        if index is None:
+            index = len(strings)
+            string_ids[string] = index
+            strings.append(string)
+        return index
+
+    columns = {name: array(TONE_TYPECODE) for name in SYLLABLE_COLUMNS}
+    columns["hanzi"] = array(INDEX_TYPECODE)
+    columns["pinyin"] = array(INDEX_TYPECODE)
+    columns["word-offsets"] = array(INDEX_TYPECODE, [0])
+    columns["sentence-offsets"] = array(INDEX_TYPECODE, [0])
+
+    for clause in sentences:
+        for word in clause:
+            for syllable in word:
+                columns["hanzi"].append(intern(syllable["hanzi"]))
+                columns["pinyin"].append(intern(syllable["pinyin"]))
+                columns["inflection-num"].append(syllable["inflection-num"])
+                columns["spoken-tone-num"].append(syllable["spoken-tone-num"])
+                columns["innate-tone-num"].append(syllable["innate-tone-num"])
+                columns["tone-mark-num"].append(syllable._marked_num)
+            columns["word-offsets"].append(len(columns["hanzi"]))
+        columns["sentence-offsets"].append(len(columns["word-offsets"]) - 1)
+
+    return SyllableColumns(strings, columns)
+
+
+def _padding(size: int):
+    return b"\0" * (-size % _ALIGNMENT)
+
+
+def write_columns(columns: SyllableColumns, file):
+    """
+    Writes the columns to a binary file, which is laid out as:
+        - the magic bytes, the format version and the size of the header.
+        - a JSON header that gives the byte order and the typecode,
+          item size, offset and length of every section.
+        - the UTF-8 bytes of every string in the strings table,
+          followed by the "string-offsets" of each string in those bytes.
+        - the bytes of each column, as they're laid out in memory.
+    Each section is padded so that it can be mapped straight into an array.
+    """
+    encoded = [string.encode("utf-8") for string in columns.strings]
+    string_offsets = array(INDEX_TYPECODE, [0])
+    for b in encoded:
+        string_offsets.append(string_offsets[-1] + len(b))
+    sections = {"strings": array("B", b"".join(encoded))}
+    sections["string-offsets"] = string_offsets
+    sections.update(columns.columns)
+
+    # finds where each section goes after the header.
+    layout = {}
+    offset = 0
+    for name, col in sections.items():
+        layout[name] = [col.typecode, col.itemsize, offset, len(col)]
+        offset += len(col) * col.itemsize
+        offset += len(_padding(offset))
+
+    header = json.dumps({"byteorder": sys.byteorder, "sections": layout})
+    header = header.encode("utf-8")
+    header += b" " * (-(_PREAMBLE.size + len(header)) % _ALIGNMENT)
+    file.write(_PREAMBLE.pack(_MAGIC, _FORMAT_VERSION, len(header)))
+    file.write(header)
+    for col in sections.values():
+        data = col.tobytes()
+        file.write(data)
+        file.write(_padding(len(data)))
+
+
+def read_columns(buffer):
+    """
+    Returns SyllableColumns whose columns are memoryviews into the buffer
+    (such as the bytes of a file, or an mmap), so nothing is copied
+    except the strings table.
+    If the file was written on a machine with another byte order,
+    the columns are copied into arrays and swapped instead.
+    """
+    buffer = memoryview(buffer)
+    magic, version, header_size = _PREAMBLE.unpack_from(buffer)
+    if magic != _MAGIC:
+        raise ValueError("The file isn't an annotated colortones file.")
+    if version != _FORMAT_VERSION:
+        raise ValueError(f"Unsupported colortones file version {version}.")
+
+    start = _PREAMBLE.size + header_size
+    header = json.loads(bytes(buffer[_PREAMBLE.size : start]))
+    swap = header["byteorder"] != sys.byteorder
+
+    sections = {}
+    for name, (typecode, itemsize, offset, length) in header["sections"].items():
+        data = buffer[start + offset : start + offset + length * itemsize]
+        if array(typecode).itemsize != itemsize:
+            msg = f'The "{name}" column has items of {itemsize} bytes.'
+            raise ValueError(msg)
+
+        if swap:
+            col = array(typecode)
+            col.frombytes(data)
+            col.byteswap()
+            sections[name] = col
+        else:
+            sections[name] = data.cast(typecode)
+
+    string_bytes = bytes(sections.pop("strings"))
+    string_offsets = sections.pop("string-offsets")
+    strings = [
+        string_bytes[string_offsets[i] : string_offsets[i + 1]].decode("utf-8")
+        for i in range(len(string_offsets) - 1)
+    ]
+    return SyllableColumns(strings, sections)
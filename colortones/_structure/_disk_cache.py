@@ -0,0 +1,92 @@
+"""
+Filename: _disk_cache.py
+Description: This file contains functionality to keep loaded data
+             in a persistent cache directory between runs.
+
+Author: TravisGK
+Version: 1.0
+
+License: GNU License
+"""
+
+import os
+import pickle
+import tempfile
+
+# bump this whenever the layout of any cached value changes.
+_CACHE_FORMAT = 1
+
+
+def cache_dir():
+    """
+    Returns the directory used for cached files, or None if disabled.
+
+    This is $COLORTONES_CACHE_DIR if it's set (an empty value disables
+    the cache), otherwise it's "colortones" in the user's cache directory.
+    """
+    path = os.environ.get("COLORTONES_CACHE_DIR")
+    if path is not None:
+        return path if len(path) > 0 else None
+
+    base = os.environ.get("XDG_CACHE_HOME")
+    if not base:
+        base = os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "colortones")
+
+
+def _get_stamp(source_paths: list):
+    """Returns a value that changes whenever any of the source files do."""
+    stamp = [_CACHE_FORMAT]
+    for path in source_paths:
+        stat = os.stat(path)
+        stamp.append((os.path.abspath(path), stat.st_mtime_ns, stat.st_size))
+    return stamp
+
+
+def load_cached(name: str, source_paths: list):
+    """
+    Returns the value cached under the name,
+    or None if it doesn't exist or its source files have since changed.
+    """
+    directory = cache_dir()
+    if directory is None:
+        return None
+
+    path = os.path.join(directory, name + ".pickle")
+    try:
+        with open(path, "rb") as file:
+            if pickle.load(file) != _get_stamp(source_paths):
+                return None  # the cache is stale.
+            return pickle.load(file)
+    except Exception:
+        return None  # the cache is missing or unreadable.
+
+
+def save_cached(name: str, value, source_paths: list):
+    """
+    Saves the value under the name, stamped with the given source files.
+    Returns True if the value was saved.
+    """
+    directory = cache_dir()
+    if directory is None:
+        return False
+
+    try:
+        os.makedirs(directory, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=directory)
+    except OSError:
+        return False
+
+    # writes to a temporary file first so readers never see a partial file.
+    try:
+        with os.fdopen(fd, "wb") as file:
+            pickle.dump(_get_stamp(source_paths), file)
+            pickle.dump(value, file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, os.path.join(directory, name + ".pickle"))
+    except (OSError, pickle.PicklingError):
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        return False
+    return True
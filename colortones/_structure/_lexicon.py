@@ -0,0 +1,170 @@
+"""
+Filename: _lexicon.py
+Description: This file contains functionality to segment clauses into words
+             and to find the pinyin of those words.
+
+Author: TravisGK
+Version: 1.0
+
+License: GNU License
+"""
+
+from ._phonetics import _tones, _transcription
+from ._segmenter import get_segmenter
+
+# pypinyin takes a while to import,
+# so it's only imported once it's first needed.
+_pypinyin = None
+
+# pypinyin's dictionaries of characters and phrases, along with one that
+# binds every character that has only one reading to that reading.
+_pinyin_dict = None
+_phrases_dict = None
+_monophonic = None
+
+
+def _get_pypinyin():
+    """Returns the pypinyin module."""
+    global _pypinyin
+    if _pypinyin is None:
+        import pypinyin
+
+        _pypinyin = pypinyin
+    return _pypinyin
+
+
+def _load_pinyin_tables():
+    """
+    Finds every character with a single reading in pypinyin's dictionary,
+    which only takes a moment since pypinyin has already loaded it.
+    """
+    global _pinyin_dict, _phrases_dict, _monophonic
+    if _monophonic is None:
+        from pypinyin.constants import PHRASES_DICT, PINYIN_DICT
+
+        _pinyin_dict = PINYIN_DICT
+        _phrases_dict = PHRASES_DICT
+        _monophonic = {
+            chr(code): reading
+            for code, reading in PINYIN_DICT.items()
+            if "," not in reading
+        }
+
+
+def _romanize_monophonic(word_str: str):
+    """
+    Returns the pinyin of the word in the same form as pypinyin gives it
+    if no character of the word can be read more than one way,
+    otherwise None.
+
+    A single character that isn't in pypinyin's dictionary
+    (such as punctuation) is its own pinyin.
+    A phrase in pypinyin's dictionary may read a character differently
+    than the character alone (such as the neutral tone of 西 in 东西),
+    so words that contain a phrase aren't romanized here.
+    """
+    if _monophonic is None:
+        _load_pinyin_tables()
+
+    if len(word_str) == 1:
+        reading = _monophonic.get(word_str)
+        if reading is not None:
+            return [[reading]]
+        if ord(word_str) not in _pinyin_dict:
+            return [[word_str]]
+        return None
+
+    p = []
+    for char in word_str:
+        reading = _monophonic.get(char)
+        if reading is None:
+            return None
+        p.append([reading])
+
+    length = len(word_str)
+    for start in range(length - 1):
+        for end in range(start + 2, length + 1):
+            if word_str[start:end] in _phrases_dict:
+                return None
+    return p
+
+
+def _romanize_with_pypinyin(word_str: str):
+    """Returns the pinyin of the word as given by pypinyin."""
+    pypinyin = _get_pypinyin()
+    return pypinyin.pinyin(word_str, style=pypinyin.Style.TONE)
+
+
+def warmup(segmenter=None):
+    """
+    Loads the segmenter's data (jieba's dictionary by default),
+    pypinyin and the phonetic tables now
+    instead of when the first text is processed.
+    """
+    get_segmenter(segmenter).load()
+    _get_pypinyin()
+    _load_pinyin_tables()
+    _tones._load_dicts()
+    _transcription._load_dicts()
+
+
+class Lexicon:
+    """
+    A Lexicon segments clauses into words and romanizes words into pinyin.
+    """
+
+    def __init__(self, segmenter=None):
+        """
+        The segmenter is a Segmenter or the name of one
+        ("jieba", "max-match" or "character"). jieba is used by default.
+        """
+        self.segmenter = get_segmenter(segmenter)
+
+    def segment(self, clause_str: str):
+        """Returns a list of the word strings that make up the clause."""
+        return self.segmenter.segment(clause_str)
+
+    def romanize(self, word_str: str):
+        """
+        Returns a list that holds a list of pinyin for each character.
+        Words whose characters have only one reading are looked up directly;
+        the rest are given to pypinyin, which reads them in context.
+        """
+        p = _romanize_monophonic(word_str)
+        if p is None:
+            p = _romanize_with_pypinyin(word_str)
+        return p
+
+
+class BatchLexicon(Lexicon):
+    """
+    A BatchLexicon segments many clauses with a single call to the segmenter
+    and romanizes every distinct word only once.
+    """
+
+    def __init__(self, clause_strings, segmenter=None):
+        """The given clause strings are segmented in bulk up front."""
+        super().__init__(segmenter)
+        unique_strs = [
+            c for c in dict.fromkeys(clause_strings) if "\n" not in c
+        ]
+        segments = self.segmenter.segment_all(unique_strs)
+        self._segments = dict(zip(unique_strs, segments))
+        self._pinyins = {}
+
+    def segment(self, clause_str: str):
+        words_list = self._segments.get(clause_str)
+        if words_list is None:
+            words_list = super().segment(clause_str)
+            self._segments[clause_str] = words_list
+        return words_list
+
+    def romanize(self, word_str: str):
+        p = self._pinyins.get(word_str)
+        if p is None:
+            p = super().romanize(word_str)
+            self._pinyins[word_str] = p
+        return p
+
+
+DEFAULT_LEXICON = Lexicon()
@@ -9,32 +9,126 @@ Version: 1.0
 License: GNU License
 """
 
-import logging
+import bisect
+import io
+import itertools
+import mmap
 import re
-import jieba
-import pypinyin
+from array import array
 from ._phonetics._inflections import *
-from ._syllable import _make_syllable
-from ._sequential_rules import (
-    inflect_yi,
-    inflect_bu,
-    inflect_neutrals,
-    apply_sequential_rule,
+from ._lexicon import DEFAULT_LEXICON
+from ._columns import (
+    INDEX_TYPECODE,
+    SyllableColumns,
+    build_columns,
+    read_columns,
+    write_columns,
 )
-
-jieba.setLogLevel(logging.ERROR)
+from ._syllable import _make_syllable, _restore_syllable
+from ._sequential_rules import flatten_words, postprocess_flat_inflections
+from .._themes._color_writer import ColorWriter
+from .._themes._html import write_html, write_svg
 
 # these will use spaces between words.
 _SPACED_OUTPUTS = ["pinyin", "ipa-root", "ipa", "pinyin-toneless"]
 
+_CLAUSE_SPLIT_PATTERN = re.compile(f"([{CLAUSE_BREAKERS + SENTENCE_ENDERS}])")
+
+
+def split_clauses(text_str: str):
+    """
+    Returns the list of clause strings in the text,
+    with each punctuation mark kept as its own clause string.
+    """
+    clause_strings = _CLAUSE_SPLIT_PATTERN.split(text_str)
+    return [c for c in clause_strings if len(c) > 0]
+
+
+def annotate_clauses(text_str: str, lexicon=DEFAULT_LEXICON, cache=None):
+    """
+    Returns the list of inflected Clauses in the text,
+    which have not yet been joined together into sentences.
+
+    If an AnnotationCache is given, clauses are read from it when possible
+    and newly annotated clauses are added to it.
+    """
+    clauses = _annotate_clause_strs(split_clauses(text_str), lexicon, cache)
+    return [clause for clause in clauses if len(clause) > 0]
+
+
+def _annotate_clause_strs(clause_strs: list, lexicon=DEFAULT_LEXICON, cache=None):
+    """
+    Returns a list of the inflected Clause of each clause string,
+    including those that have no words (such as whitespace).
+    """
+    clauses = []
+    for clause_str in clause_strs:
+        clause = None
+        if cache is not None:
+            rows = cache.get(clause_str, lexicon.segmenter.name)
+            if rows is not None:
+                clause = _restore_clause(rows)
+        if clause is None:
+            clause = Clause(clause_str, lexicon=lexicon)
+            if cache is not None:
+                cache.put(clause_str, clause.words, lexicon.segmenter.name)
+        clauses.append(clause)
+    return clauses
+
+
+def _restore_clause(rows: list):
+    """Returns a Clause from the words' syllable rows of an AnnotationCache."""
+    clause = Clause()
+    clause.words = [
+        Word(syllables=[_restore_syllable(*row) for row in word_rows])
+        for word_rows in rows
+    ]
+    return clause
+
+
+def _unite_words(first_clause, words: list):
+    """
+    Returns a sentence of the words, reusing the first Clause
+    if the sentence is made of that Clause alone.
+    """
+    if len(words) == len(first_clause.words):
+        return first_clause
+    sentence = Clause()
+    sentence.words = words
+    return sentence
+
+
+def _render(structure, keys, color_scheme, file=None):
+    """
+    Renders the Word, Clause or Paragraph with the color scheme
+    for every key in a single pass, returning a dictionary of the
+    colored text of each key, or writing a single key's text to the file.
+    """
+    writers = {key: ColorWriter(file) for key in keys}
+    structure._write_color(writers, color_scheme)
+    for writer in writers.values():
+        writer.finish()
+    if file is None:
+        return {key: writer.getvalue() for key, writer in writers.items()}
+
 
 class Word:
     """
     A Word holds a list of syllable dictionaries.
     """
 
-    def __init__(self, word: str):
-        p = pypinyin.pinyin(word, style=pypinyin.Style.TONE)
+    def __init__(
+        self,
+        word: str = None,
+        lexicon=DEFAULT_LEXICON,
+        syllables: list = [],
+    ):
+        """The list of syllables are used if no word is given."""
+        if word is None:
+            self.syllables = list(syllables)
+            return
+
+        p = lexicon.romanize(word)
         self.syllables = [
             _make_syllable(word[i], p[i][0])
             for i in range(len(word))
@@ -58,28 +152,37 @@ class Word:
         return self.syllables[0].is_punct()
 
     def to_color_str(self, key, color_scheme):
-        result = ""
-        last_content = None
-        for syllable in self.syllables:
-            result += color_scheme[syllable["inflection-num"]][2]
-
-            if (
-                not syllable.is_punct()
-                and key in _SPACED_OUTPUTS
-                and last_content is not None
-                and strip_tone_marker(syllable[key][0]) in "aeiou"
-            ):
-                content = "'" + syllable[key]
-            elif syllable.is_punct():
-                content = syllable["hanzi"]
-            else:
-                content = syllable[key]
-
-            result += content
-            result += "\033[0m"
-            last_content = content
+        return _render(self, [key], color_scheme)[key]
+
+    def to_color_strs(self, keys, color_scheme):
+        return _render(self, keys, color_scheme)
+
+    def write_color(self, file, key, color_scheme):
+        _render(self, [key], color_scheme, file)
+
+    def _write_color(self, writers, color_scheme, start=0, end=None):
+        """Writes the syllables from index <start> up to <end>."""
+        if end is None:
+            end = len(self.syllables)
+        for i in range(start, end):
+            syllable = self.syllables[i]
+            color = color_scheme[syllable["inflection-num"]][2]
+            if syllable.is_punct():
+                for writer in writers.values():
+                    writer.write(syllable["hanzi"], color)
+                continue
 
-        return result
+            for key, writer in writers.items():
+                content = syllable[key]
+                if (
+                    i > 0
+                    and key in _SPACED_OUTPUTS
+                    and strip_tone_marker(content[0]) in "aeiou"
+                ):
+                    # separates syllables that begin with a vowel.
+                    writer.write("'" + content, color)
+                else:
+                    writer.write(content, color)
 
 
 class Clause:
@@ -91,13 +194,14 @@ class Clause:
         self,
         clause_str: str = None,
         clauses_to_unite: list = [],
+        lexicon=DEFAULT_LEXICON,
     ):
         """The list of clauses are Sentences that will be combined."""
         self.words = []
         if clause_str is not None:
-            words_list = jieba.lcut(clause_str)
+            words_list = lexicon.segment(clause_str)
             for word_str in words_list:
-                word = Word(word_str)
+                word = Word(word_str, lexicon)
                 if len(word) > 0:
                     self.words.append(word)
             self._postprocess_inflections()
@@ -119,43 +223,148 @@ class Clause:
         Modifies the inflections so that they reflect their context.
         """
         if len(self.words) > 1 or (len(self.words) == 1 and len(self.words[0]) > 1):
-            inflect_yi(self.words)
-            inflect_bu(self.words)
-            inflect_neutrals(self.words)
-            apply_sequential_rule(self.words, LOW_INFLECTION, RISING_LOW_INFLECTION)
-            apply_sequential_rule(
-                self.words, FALLING_INFLECTION, HALF_FALLING_INFLECTION
-            )
+            syllables, word_starts = flatten_words(self.words)
+            postprocess_flat_inflections(syllables, word_starts)
 
     def to_color_str(self, key, color_scheme):
-        result = ""
+        return _render(self, [key], color_scheme)[key]
+
+    def to_color_strs(self, keys, color_scheme):
+        return _render(self, keys, color_scheme)
+
+    def write_color(self, file, key, color_scheme):
+        _render(self, [key], color_scheme, file)
+
+    def _write_color(self, writers, color_scheme, start=0, end=None):
+        """
+        Writes the syllables from index <start> up to <end> of the Clause,
+        exactly as they appear when the whole Clause is written.
+        """
+        spaced_writers = [w for k, w in writers.items() if k in _SPACED_OUTPUTS]
+        word_start = 0
         for i, word in enumerate(self.words):
-            result += word.to_color_str(key, color_scheme)
-            if (
-                i + 1 < len(self.words)
-                and not self.words[i + 1].is_punct()
-                and key in _SPACED_OUTPUTS
-            ):
-                result += " "
-        return result
+            word_end = word_start + len(word)
+            if end is not None and word_start >= end:
+                break
+            if word_end > start:
+                word._write_color(
+                    writers,
+                    color_scheme,
+                    max(0, start - word_start),
+                    len(word) if end is None else min(len(word), end - word_start),
+                )
+                if (
+                    i + 1 < len(self.words)
+                    and (end is None or word_end < end)
+                    and not self.words[i + 1].is_punct()
+                ):
+                    for writer in spaced_writers:
+                        writer.write(" ")
+            word_start = word_end
+
+
+class _ColumnarSentences:
+    """
+    _ColumnarSentences act as the list of sentences of a columnar Paragraph,
+    creating each Clause from the columns only when it's accessed.
+    """
+
+    def __init__(self, columns):
+        self.columns = columns
+
+    def __len__(self):
+        return len(self.columns)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("sentence index out of range")
+
+        word_offsets = self.columns.columns["word-offsets"]
+        sentence_offsets = self.columns.columns["sentence-offsets"]
+        clause = Clause()
+        for w in range(sentence_offsets[index], sentence_offsets[index + 1]):
+            syllables = self.columns.iter_syllables(
+                word_offsets[w], word_offsets[w + 1]
+            )
+            clause.words.append(Word(syllables=syllables))
+        return clause
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
 
 
 class Paragraph:
     """
     A Paragraph holds a list of words.
-    """
 
-    def __init__(self, text_str: str):
-        clause_strings = re.split(f"([{CLAUSE_BREAKERS + SENTENCE_ENDERS}])", text_str)
-        self.sentences = []
-        for clause_str in clause_strings:
-            if len(clause_str) == 0:
-                continue
+    A columnar Paragraph keeps its syllables in flat arrays instead,
+    which use far less memory, and creates its Clauses on access.
+    """
 
-            clause = Clause(clause_str)
-            if len(clause) > 0:
-                self.sentences.append(clause)
-        self.sentences = Paragraph._join_clauses(self.sentences)
+    def __init__(
+        self,
+        text_str: str = None,
+        lexicon=DEFAULT_LEXICON,
+        clauses_to_join: list = [],
+        columnar: bool = False,
+        cache=None,
+    ):
+        """
+        The list of clauses are already annotated and will be joined.
+        If an AnnotationCache is given, the text's clauses are cached.
+        """
+        clause_strs = None
+        clauses = None
+        if text_str is not None:
+            clause_strs = split_clauses(text_str)
+            clauses = _annotate_clause_strs(clause_strs, lexicon, cache)
+        self._build(text_str, clause_strs, clauses, clauses_to_join, columnar)
+
+    @classmethod
+    def _from_annotated(
+        cls,
+        text_str: str,
+        clause_strs: list,
+        clauses: list,
+        columnar: bool = False,
+    ):
+        """
+        Returns the Paragraph of the text from its clause strings
+        and the Clause of each of them (as given by _annotate_clause_strs),
+        which is the same Paragraph that annotating the text would give.
+        """
+        paragraph = cls.__new__(cls)
+        paragraph._build(text_str, clause_strs, clauses, [], columnar)
+        return paragraph
+
+    def _build(self, text_str, clause_strs, clauses, clauses_to_join, columnar):
+        # the length of each clause string of the text and its Clause,
+        # (or None if it has no words) which are kept to make edits.
+        self._clause_lengths = None
+        self._raw_clauses = None
+
+        if clauses is not None:
+            clauses_to_join = [clause for clause in clauses if len(clause) > 0]
+            if not columnar:
+                self._clause_lengths = array(INDEX_TYPECODE, map(len, clause_strs))
+                self._raw_clauses = [c if len(c) > 0 else None for c in clauses]
+        self.sentences = Paragraph._join_clauses(clauses_to_join)
+        self._columns = None
+
+        # the source text is kept to find the text offset of each syllable,
+        # which (along with the word and sentence offsets) is found on demand.
+        self._text_str = text_str
+        self._text_offsets = None
+        self._offsets = None
+        if columnar:
+            self._columns = build_columns(self.sentences)
+            self.sentences = _ColumnarSentences(self._columns)
 
     def __getitem__(self, index):
         return self.sentences[index]
@@ -163,43 +372,287 @@ class Paragraph:
     def __iter__(self):
         return iter(self.sentences)
 
+    def __len__(self):
+        return len(self.sentences)
+
+    def is_columnar(self):
+        return self._columns is not None
+
+    def to_arrays(self):
+        """
+        Returns a dictionary of the Paragraph's syllables as columns.
+
+        Every column is a memoryview of an array (such as "inflection-num"),
+        which numpy.frombuffer can wrap without copying.
+        The "hanzi" and "pinyin" columns index into the "strings" list.
+        See SyllableColumns for a description of every column.
+
+        The columns of a columnar Paragraph are returned without copying;
+        otherwise they're built from the current syllables.
+        """
+        if self._columns is not None:
+            return self._columns.to_arrays()
+        return build_columns(self.sentences).to_arrays()
+
+    def save(self, path: str):
+        """
+        Saves the annotated Paragraph to a compact binary file,
+        which can be loaded again with load_paragraph.
+        The offsets of the syllables in the source text are saved too.
+        """
+        columns = self._columns
+        if columns is None:
+            columns = build_columns(self.sentences)
+        text_offsets = self._get_text_offsets()
+        if text_offsets is not None:
+            # the text offsets are saved as one more column.
+            column_dict = dict(columns.columns)
+            column_dict["text-offsets"] = text_offsets
+            columns = SyllableColumns(columns.strings, column_dict)
+        with open(path, "wb") as file:
+            write_columns(columns, file)
+
+    def edit(
+        self,
+        offset: int,
+        deleted_length: int,
+        inserted_str: str,
+        lexicon=DEFAULT_LEXICON,
+        cache=None,
+    ):
+        """
+        Replaces <deleted_length> characters of the text at the offset
+        with the inserted string. Only the clauses that touch the edit
+        are segmented and inflected again, and the sentences are rejoined,
+        which gives the same Paragraph as processing the new text.
+        Newlines in the inserted string become spaces, as they do in process_text.
+
+        Only a Paragraph that was made from text
+        and isn't columnar can be edited.
+        """
+        if self._raw_clauses is None:
+            msg = "Only a Paragraph made from text that isn't columnar can be edited."
+            raise ValueError(msg)
+        text_str = self._text_str
+        end = offset + deleted_length
+        if not 0 <= offset <= end <= len(text_str):
+            raise IndexError("the edit is outside of the text")
+
+        # finds the clauses that overlap or border the edit.
+        # every other clause is bordered by the same punctuation as before,
+        # so the text outside of these splits and inflects just as it did.
+        starts = [0]
+        starts.extend(itertools.accumulate(self._clause_lengths))
+        num_clauses = len(self._clause_lengths)
+        first = max(0, bisect.bisect_left(starts, offset, 1) - 1)
+        last = min(num_clauses, bisect.bisect_right(starts, end, 0, num_clauses))
+        region_start = starts[first]
+        region_end = starts[last]
+
+        inserted_str = inserted_str.replace("\n", " ")
+        new_text_str = text_str[:offset] + inserted_str + text_str[end:]
+        region_end += len(inserted_str) - deleted_length
+        clause_strs = split_clauses(new_text_str[region_start:region_end])
+        clauses = _annotate_clause_strs(clause_strs, lexicon, cache)
+
+        self._clause_lengths[first:last] = array(INDEX_TYPECODE, map(len, clause_strs))
+        self._raw_clauses[first:last] = [c if len(c) > 0 else None for c in clauses]
+        self._text_str = new_text_str
+        self._text_offsets = None
+        self._offsets = None
+        self.sentences = Paragraph._join_clauses(
+            [clause for clause in self._raw_clauses if clause is not None]
+        )
+        if cache is not None:
+            cache.flush()
+
+    def _get_offsets(self):
+        """
+        Returns the index of the first syllable of each word
+        and the index of the first word of each sentence,
+        each followed by the total number of syllables or words.
+        """
+        if self._columns is not None:
+            columns = self._columns.columns
+            return columns["word-offsets"], columns["sentence-offsets"]
+
+        if self._offsets is None:
+            word_offsets = array(INDEX_TYPECODE, [0])
+            sentence_offsets = array(INDEX_TYPECODE, [0])
+            num_syllables = 0
+            for clause in self.sentences:
+                for word in clause:
+                    num_syllables += len(word)
+                    word_offsets.append(num_syllables)
+                sentence_offsets.append(len(word_offsets) - 1)
+            self._offsets = (word_offsets, sentence_offsets)
+        return self._offsets
+
+    def _get_text_offsets(self):
+        """
+        Returns the offset in the source text of each syllable,
+        or None if the Paragraph wasn't made from text.
+        """
+        if self._text_offsets is None and self._text_str is not None:
+            text_str = self._text_str
+            text_offsets = array(INDEX_TYPECODE)
+            offset = 0
+            for clause in self.sentences:
+                for word in clause:
+                    for syllable in word:
+                        # whitespace in the text has no syllables.
+                        offset = text_str.index(syllable["hanzi"], offset)
+                        text_offsets.append(offset)
+                        offset += len(syllable["hanzi"])
+            self._text_offsets = text_offsets
+        return self._text_offsets
+
+    def num_syllables(self):
+        word_offsets, _ = self._get_offsets()
+        return word_offsets[-1]
+
+    def syllable_offset(self, text_offset: int):
+        """
+        Returns the index of the first syllable at or after the offset
+        in the source text. If the Paragraph wasn't made from text,
+        the text is taken to be its hanzi with nothing between them.
+        """
+        text_offsets = self._get_text_offsets()
+        if text_offsets is None:
+            return max(0, min(text_offset, self.num_syllables()))
+        return bisect.bisect_left(text_offsets, text_offset)
+
+    def locate(self, syllable_offset: int):
+        """
+        Returns the (sentence index, word index, syllable index)
+        of the syllable at the given index within the whole Paragraph.
+        """
+        word_offsets, sentence_offsets = self._get_offsets()
+        if not 0 <= syllable_offset < word_offsets[-1]:
+            raise IndexError("syllable offset out of range")
+
+        word_i = bisect.bisect_right(word_offsets, syllable_offset) - 1
+        sentence_i = bisect.bisect_right(sentence_offsets, word_i) - 1
+        return (
+            sentence_i,
+            word_i - sentence_offsets[sentence_i],
+            syllable_offset - word_offsets[word_i],
+        )
+
+    def render_range(self, start: int, end: int, key="hanzi", color_scheme=None):
+        """
+        Returns the colored text of the syllables from index <start> up to
+        <end>, exactly as they appear in the colored text of the Paragraph.
+        Only the sentences that hold those syllables are visited.
+        (syllable_offset converts offsets in the source text to these.)
+        """
+        writer = ColorWriter()
+        self._write_color_range({key: writer}, color_scheme, start, end)
+        writer.finish()
+        return writer.getvalue()
+
+    def _write_color_range(self, writers, color_scheme, start, end):
+        word_offsets, sentence_offsets = self._get_offsets()
+        start = max(0, start)
+        end = min(end, word_offsets[-1])
+        if start >= end:
+            return
+
+        word_i = bisect.bisect_right(word_offsets, start) - 1
+        sentence_i = bisect.bisect_right(sentence_offsets, word_i) - 1
+        while sentence_i < len(sentence_offsets) - 1:
+            sentence_start = word_offsets[sentence_offsets[sentence_i]]
+            if sentence_start >= end:
+                break
+            self.sentences[sentence_i]._write_color(
+                writers,
+                color_scheme,
+                max(0, start - sentence_start),
+                end - sentence_start,
+            )
+            sentence_i += 1
+
     def _join_clauses(clauses):
-        """Connects clauses together as one sentence."""
-        ITERATIONS = 5
-        for _ in range(ITERATIONS):
-            new_sentences = []
-
-            index = 0
-            while index < len(clauses):
-                s = clauses[index]
-                if (
-                    index + 1 < len(clauses)
-                    and len(clauses[index + 1]) == 1
-                    and clauses[index + 1][-1][-1]["hanzi"] in SENTENCE_ENDERS
-                ):
-                    # unites the sentence-ending punctuation
-                    # to the end of the current sentence.
-                    next_s_1 = clauses[index + 1]
-                    new_sentence = Clause(clauses_to_unite=[s, next_s_1])
-                    new_sentences.append(new_sentence)
-                    index += 2
-                elif (
-                    index + 2 < len(clauses)
-                    and clauses[index + 1][-1][-1]["hanzi"] in CLAUSE_BREAKERS
-                ):
-                    # a clause-breaker unites the text on both
-                    # its left and right sides.
-                    next_s_1 = clauses[index + 1]
-                    next_s_2 = clauses[index + 2]
-                    new_sentence = Clause(clauses_to_unite=[s, next_s_1, next_s_2])
-                    new_sentences.append(new_sentence)
-                    index += 3
-                else:
-                    new_sentences.append(s)
-                    index += 1
+        """
+        Connects clauses together into sentences in a single pass.
 
-            clauses = new_sentences
-        return clauses
+        Sentence-ending punctuation joins the clause before it,
+        and clause-breaking punctuation joins the clauses on both sides,
+        so a sentence only ends where a run of sentence enders
+        is followed by a clause of words.
+        """
+        sentences = []
+        words = []
+        first_clause = None
+        ends_sentence = False
+        for clause in clauses:
+            hanzi = clause[-1][-1]["hanzi"]
+            is_punct = hanzi in SENTENCE_ENDERS or hanzi in CLAUSE_BREAKERS
+            if ends_sentence and not is_punct:
+                sentences.append(_unite_words(first_clause, words))
+                words = []
+
+            if len(words) == 0:
+                first_clause = clause
+            words.extend(clause.words)
+            ends_sentence = hanzi in SENTENCE_ENDERS
+
+        if len(words) > 0:
+            sentences.append(_unite_words(first_clause, words))
+        return sentences
 
     def to_color_str(self, key="hanzi", color_scheme=None):
-        return "".join(c.to_color_str(key, color_scheme) for c in self.sentences)
+        return _render(self, [key], color_scheme)[key]
+
+    def to_color_strs(self, keys=["hanzi", "pinyin"], color_scheme=None):
+        """
+        Returns a dictionary of the colored text for each of the keys,
+        which are all rendered in a single pass over the Paragraph.
+        """
+        return _render(self, keys, color_scheme)
+
+    def write_color(self, file, key="hanzi", color_scheme=None):
+        """Writes the colored text straight to the file (such as sys.stdout)."""
+        _render(self, [key], color_scheme, file)
+
+    def to_html(self, color_scheme, annotation: str = None, standalone=True):
+        """
+        Returns the Paragraph as HTML, with the transcription of the
+        annotation key (such as "pinyin") written above each hanzi.
+        """
+        file = io.StringIO()
+        write_html(self.sentences, file, color_scheme, annotation, standalone)
+        return file.getvalue()
+
+    def to_svg(self, color_scheme, annotation: str = None, **kwargs):
+        """Returns the Paragraph as an SVG image (see write_svg)."""
+        file = io.StringIO()
+        write_svg(self.sentences, file, color_scheme, annotation, **kwargs)
+        return file.getvalue()
+
+    def _write_color(self, writers, color_scheme):
+        for clause in self.sentences:
+            clause._write_color(writers, color_scheme)
+
+
+def load_paragraph(path: str, use_mmap: bool = True):
+    """
+    Returns the columnar Paragraph that was saved to the file.
+
+    Parameters:
+    path (str): the path of a file written by Paragraph.save.
+    use_mmap (bool): if True, the file is memory-mapped rather than read,
+                     so its columns are only paged in when they're used
+                     and the same file can be shared by many processes.
+    """
+    with open(path, "rb") as file:
+        if use_mmap:
+            buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            buffer = file.read()
+
+    paragraph = Paragraph()
+    paragraph._columns = read_columns(buffer)
+    paragraph._text_offsets = paragraph._columns.columns.pop("text-offsets", None)
+    paragraph.sentences = _ColumnarSentences(paragraph._columns)
+    return paragraph
@@ -0,0 +1,158 @@
+"""
+Filename: _parallel.py
+Description: This file contains functionality to annotate long texts
+             across a pool of worker processes.
+
+Author: TravisGK
+Version: 1.0
+
+License: GNU License
+"""
+
+import itertools
+import re
+from ._phonetics._tones import SENTENCE_ENDERS
+from ._annotation_cache import _to_rows
+from ._lexicon import Lexicon, warmup
+from ._paragraph import _annotate_clause_strs, _restore_clause, annotate_clauses
+from ._segmenter import get_segmenter
+
+# splits text directly after each run of sentence enders.
+_SENTENCE_SPLIT_PATTERN = re.compile(f"(?<=[{SENTENCE_ENDERS}])(?![{SENTENCE_ENDERS}])")
+
+# the number of batches each worker is given in a single call.
+_BATCHES_PER_WORKER = 4
+
+_executor = None
+_executor_key = None
+
+
+def _init_worker(segmenter):
+    """Loads the segmenter's data and the phonetic tables once per worker."""
+    warmup(segmenter)
+
+
+def _get_executor(workers: int, segmenter):
+    """Returns a process pool with the given number of workers."""
+    global _executor, _executor_key
+    key = (workers, segmenter)
+    if _executor is None or _executor_key != key:
+        # multiprocessing takes a while to import, so it's only imported here.
+        from concurrent.futures import ProcessPoolExecutor
+
+        shutdown_workers()
+        _executor = ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(segmenter,),
+        )
+        _executor_key = key
+    return _executor
+
+
+def shutdown_workers():
+    """Shuts down the worker processes used for parallel annotation."""
+    global _executor, _executor_key
+    if _executor is not None:
+        _executor.shutdown()
+        _executor = None
+        _executor_key = None
+
+
+def _annotate_sentence(sentence_str: str, segmenter):
+    return annotate_clauses(sentence_str, Lexicon(segmenter))
+
+
+def _annotate_clause_batch(clause_strs: list, segmenter):
+    return _annotate_clause_strs(clause_strs, Lexicon(segmenter))
+
+
+def split_sentences(text_str: str):
+    """Returns the text split after every run of sentence enders."""
+    return [s for s in _SENTENCE_SPLIT_PATTERN.split(text_str) if len(s) > 0]
+
+
+def annotate_clauses_in_parallel(text_str: str, workers: int, segmenter=None):
+    """
+    Returns the list of inflected Clauses in the text,
+    in the same order as annotate_clauses would give them.
+    The segmenter is best given by name, so that each worker
+    loads its data once rather than receiving a copy with every batch.
+
+    Every clause is inflected in isolation,
+    so the sentences can be given to the workers in any grouping.
+    The worker processes are kept alive and reused by later calls.
+    """
+    sentence_strs = split_sentences(text_str)
+    if len(sentence_strs) == 0:
+        return []
+
+    chunksize = max(1, len(sentence_strs) // (workers * _BATCHES_PER_WORKER))
+    executor = _get_executor(workers, segmenter)
+    clauses = []
+    for sentence_clauses in executor.map(
+        _annotate_sentence,
+        sentence_strs,
+        itertools.repeat(segmenter),
+        chunksize=chunksize,
+    ):
+        clauses.extend(sentence_clauses)
+    return clauses
+
+
+def annotate_clause_strs_in_parallel(
+    clause_strs: list,
+    workers: int,
+    segmenter=None,
+    cache=None,
+):
+    """
+    Returns a list of the inflected Clause of each clause string
+    (including those that have no words), like _annotate_clause_strs.
+
+    If an AnnotationCache is given, the cached clauses are read from it
+    and only the rest are given to the workers,
+    after which they're added to the cache.
+    """
+    name = get_segmenter(segmenter).name
+    missing_strs = clause_strs
+    rows = {}
+    if cache is not None:
+        # finds each missing clause string once, since repeats are then cached.
+        missing_strs = list(dict.fromkeys(cache.missing(clause_strs, name)))
+
+        # reads the cached clauses before any new ones are put in the cache,
+        # since putting them may evict the cached ones.
+        missing_set = set(missing_strs)
+        for clause_str in clause_strs:
+            if clause_str not in missing_set and clause_str not in rows:
+                rows[clause_str] = cache.get(clause_str, name)
+
+    annotated = []
+    if len(missing_strs) > 0:
+        batch_size = -(-len(missing_strs) // (workers * _BATCHES_PER_WORKER))
+        batches = [
+            missing_strs[i : i + batch_size]
+            for i in range(0, len(missing_strs), batch_size)
+        ]
+        executor = _get_executor(workers, segmenter)
+        for batch_clauses in executor.map(
+            _annotate_clause_batch, batches, itertools.repeat(segmenter)
+        ):
+            annotated.extend(batch_clauses)
+    if cache is None:
+        return annotated
+
+    # the first of each missing clause is the one that was annotated,
+    # while any repeats of it are restored from its rows like the rest.
+    annotated = dict(zip(missing_strs, annotated))
+    clauses = []
+    for clause_str in clause_strs:
+        clause = annotated.pop(clause_str, None)
+        if clause is None:
+            clause = _restore_clause(rows[clause_str])
+        else:
+            rows[clause_str] = _to_rows(clause.words)
+            cache.put(clause_str, clause.words, name)
+        clauses.append(clause)
+    return clauses
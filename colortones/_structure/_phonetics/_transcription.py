@@ -18,10 +18,14 @@ _TO_INITIALS = {}
 _TO_FINALS = {}
 _TO_SEGMENTS = {}
 
+# binds every toneless pinyin syllable to its root zhuyin and IPA.
+_TO_ZHUYIN_AND_IPA = {}
+
 
 def _load_dicts():
     """Loads the necessary transcription dictionaries if not yet done."""
     global _TO_EXCEPTIONS, _TO_INITIALS, _TO_FINALS, _TO_SEGMENTS
+    global _TO_ZHUYIN_AND_IPA
     if len(_TO_EXCEPTIONS) > 0:
         return  # already loaded.
 
@@ -33,19 +37,17 @@ def _load_dicts():
     _TO_INITIALS = contents["initials"]
     _TO_FINALS = contents["finals"]
     _TO_SEGMENTS = contents["pinyin-segments"]
+    _TO_ZHUYIN_AND_IPA = _build_syllable_table()
 
 
-def to_zhuyin_and_ipa(pinyin_syllable: str):
-    """Returns the root transcriptions for Zhuyin and IPA."""
-    _load_dicts()
-    p = pinyin_syllable
-
-    if len(p) == 1 and p[0] in PUNCTUATION + " ":
-        return "", ""
-
+def _transcribe_by_rules(p: str):
+    """
+    Returns the root transcriptions for Zhuyin and IPA
+    by splitting the syllable into its initial and final.
+    """
     result = _TO_EXCEPTIONS.get(p)
     if result is not None:
-        return result
+        return tuple(result)
 
     start, end = None, None
     if len(p) > 1 and p[1] == "h" and p[0] in "zcs":  # zh, ch, sh
@@ -66,3 +68,42 @@ def to_zhuyin_and_ipa(pinyin_syllable: str):
     ipa = initial[1] + ending[1]
 
     return zhuyin, ipa
+
+
+def _build_syllable_table():
+    """
+    Returns a dictionary that binds every syllable
+    the transcription rules can handle to its root zhuyin and IPA.
+
+    These are the exceptions, the syllables that begin with a vowel,
+    and every pairing of an initial with a final.
+    """
+    candidates = list(_TO_EXCEPTIONS.keys())
+    candidates.extend(_TO_SEGMENTS.keys())
+    candidates.extend(_TO_FINALS.keys())
+    for initial in _TO_INITIALS.keys():
+        candidates.extend(initial + final for final in _TO_FINALS.keys())
+
+    table = {}
+    for p in candidates:
+        try:
+            table[p] = _transcribe_by_rules(p)
+        except KeyError:
+            continue  # the rules can't split this syllable.
+
+    for char in PUNCTUATION + " ":
+        table[char] = ("", "")
+
+    return table
+
+
+def to_zhuyin_and_ipa(pinyin_syllable: str):
+    """Returns the root transcriptions for Zhuyin and IPA."""
+    _load_dicts()
+    result = _TO_ZHUYIN_AND_IPA.get(pinyin_syllable)
+    if result is None:
+        raise ValueError(
+            f'"{pinyin_syllable}" is not a pinyin syllable '
+            "that can be transcribed into zhuyin and the IPA."
+        )
+    return result
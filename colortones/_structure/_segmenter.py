@@ -0,0 +1,285 @@
+"""
+Filename: _segmenter.py
+Description: This file contains the segmenters that split clauses into words:
+             jieba, a fast maximum-matching segmenter over a word list,
+             and a segmenter that treats every character as its own word.
+
+Author: TravisGK
+Version: 1.0
+
+License: GNU License
+"""
+
+import hashlib
+import importlib.util
+import logging
+import os
+from ._disk_cache import load_cached, save_cached
+
+# jieba takes a while to import and load,
+# so it's only imported once it's first needed.
+_jieba = None
+
+
+def _load_jieba_dictionary(jieba):
+    """
+    Loads jieba's default prefix dictionary from the colortones cache,
+    which loads several times faster than jieba's own cache.
+    """
+    tokenizer = jieba.dt
+    if tokenizer.initialized or tokenizer.dictionary != jieba.DEFAULT_DICT:
+        return  # already loaded or a custom dictionary is used.
+
+    dict_path = os.path.join(os.path.dirname(jieba.__file__), jieba.DEFAULT_DICT_NAME)
+    cached = load_cached("jieba-" + jieba.__version__, [dict_path])
+    if cached is None:
+        tokenizer.initialize()
+        save_cached(
+            "jieba-" + jieba.__version__,
+            (tokenizer.FREQ, tokenizer.total),
+            [dict_path],
+        )
+    else:
+        tokenizer.FREQ, tokenizer.total = cached
+        tokenizer.initialized = True
+
+
+def _get_jieba():
+    """Returns the jieba module with its dictionary loaded."""
+    global _jieba
+    if _jieba is None:
+        import jieba
+
+        jieba.setLogLevel(logging.ERROR)
+        _load_jieba_dictionary(jieba)
+        _jieba = jieba
+    return _jieba
+
+
+class Segmenter:
+    """
+    A Segmenter splits clause strings into word strings.
+
+    Word boundaries decide which pinyin pypinyin picks for polyphonic
+    characters and where the sequential tone rules apply.
+    Every segmenter has a name, which keeps the clauses it annotated apart
+    from those of other segmenters in an AnnotationCache,
+    so segmenters that split text differently need different names.
+    """
+
+    name = None
+
+    def load(self):
+        """Loads any data the segmenter needs ahead of time."""
+        pass
+
+    def segment(self, clause_str: str):
+        """Returns a list of the word strings that make up the clause."""
+        raise NotImplementedError
+
+    def segment_all(self, clause_strs: list):
+        """Returns a list of segmented words for each of the given clauses."""
+        return [self.segment(clause_str) for clause_str in clause_strs]
+
+
+class JiebaSegmenter(Segmenter):
+    """
+    The JiebaSegmenter uses jieba's statistical model,
+    which is the most accurate but the slowest segmenter
+    and takes a second or so to load its dictionary the first time.
+    """
+
+    name = "jieba"
+
+    def load(self):
+        _get_jieba()
+
+    def segment(self, clause_str: str):
+        return _get_jieba().lcut(clause_str)
+
+    def segment_all(self, clause_strs: list):
+        """
+        jieba segments every block of text between whitespace on its own,
+        so joining the clauses with newlines gives the same words
+        as segmenting each clause separately.
+        """
+        if len(clause_strs) == 0:
+            return []
+
+        results = [[]]
+        for word_str in _get_jieba().cut("\n".join(clause_strs)):
+            if word_str == "\n":
+                results.append([])
+            elif word_str == "\r\n":
+                # jieba keeps a carriage return together with the newline.
+                results[-1].append("\r")
+                results.append([])
+            else:
+                results[-1].append(word_str)
+        return results
+
+
+def _get_default_word_sources():
+    """
+    Returns the paths of pypinyin's phrase dictionary
+    and jieba's dictionary (if jieba is installed).
+    jieba's dictionary is only read as a word list, so jieba isn't imported.
+    """
+    import pypinyin.phrases_dict
+
+    paths = [pypinyin.phrases_dict.__file__]
+    spec = importlib.util.find_spec("jieba")
+    if spec is not None and spec.origin is not None:
+        dict_path = os.path.join(os.path.dirname(spec.origin), "dict.txt")
+        if os.path.exists(dict_path):
+            paths.append(dict_path)
+    return paths
+
+
+def _read_default_words(paths: list):
+    """Yields every word of pypinyin's phrases and of jieba's dictionary."""
+    from pypinyin.constants import PHRASES_DICT
+
+    yield from PHRASES_DICT.keys()
+    for path in paths[1:]:
+        with open(path, "r", encoding="utf-8") as file:
+            for line in file:
+                yield line.split(" ", 1)[0]
+
+
+def _build_prefixes(words):
+    """
+    Returns a dictionary that binds every word of two or more characters
+    to True and every shorter beginning of those words to False,
+    which lets a word be matched one character at a time like a trie.
+    """
+    prefixes = {}
+    for word_str in words:
+        if len(word_str) < 2:
+            continue
+        for i in range(1, len(word_str)):
+            prefixes.setdefault(word_str[:i], False)
+        prefixes[word_str] = True
+    return prefixes
+
+
+class MaxMatchSegmenter(Segmenter):
+    """
+    The MaxMatchSegmenter takes the longest word of its word list
+    at each position of the clause, going left to right.
+    It's around ten times as fast as jieba, though it doesn't weigh
+    competing splits, so an ambiguous run of characters is occasionally
+    split differently. Characters that begin no word are words on their own.
+
+    By default, the word list is pypinyin's phrases together with
+    jieba's dictionary, which is built once and kept in the colortones cache.
+    """
+
+    def __init__(self, words=None):
+        """
+        Parameters:
+        words: an iterable of word strings to use instead of the default list.
+        """
+        self._prefixes = None
+        self.name = "max-match"
+        if words is not None:
+            words = sorted(set(words))
+            self._prefixes = _build_prefixes(words)
+            digest = hashlib.sha256("\n".join(words).encode()).hexdigest()
+            self.name += "-" + digest[:16]
+
+    def __getstate__(self):
+        # the default table is loaded again rather than sent to other processes.
+        state = dict(self.__dict__)
+        if self.name == "max-match":
+            state["_prefixes"] = None
+        return state
+
+    def load(self):
+        if self._prefixes is not None:
+            return
+
+        from pypinyin import __version__ as pypinyin_version
+
+        paths = _get_default_word_sources()
+        name = "max-match-" + pypinyin_version
+        prefixes = load_cached(name, paths)
+        if prefixes is None:
+            prefixes = _build_prefixes(_read_default_words(paths))
+            save_cached(name, prefixes, paths)
+        self._prefixes = prefixes
+
+    def segment(self, clause_str: str):
+        if self._prefixes is None:
+            self.load()
+        prefixes = self._prefixes
+
+        words_list = []
+        start = 0
+        length = len(clause_str)
+        while start < length:
+            # extends the match while it's still the beginning of some word.
+            end = start + 1
+            stop = start + 1
+            prefix = clause_str[start]
+            while prefix in prefixes:
+                if prefixes[prefix]:
+                    end = stop
+                if stop >= length:
+                    break
+                stop += 1
+                prefix = clause_str[start:stop]
+            words_list.append(clause_str[start:end])
+            start = end
+        return words_list
+
+
+class CharacterSegmenter(Segmenter):
+    """
+    The CharacterSegmenter makes every character its own word.
+    It costs nearly nothing, but polyphonic characters are romanized
+    without the words around them (so 银行 is read as "yínxíng")
+    and tone rules that depend on word boundaries aren't applied.
+    """
+
+    name = "character"
+
+    def segment(self, clause_str: str):
+        return list(clause_str)
+
+
+# the segmenters that can be chosen by name.
+_SEGMENTER_CLASSES = {
+    "jieba": JiebaSegmenter,
+    "max-match": MaxMatchSegmenter,
+    "character": CharacterSegmenter,
+}
+_segmenters = {}
+
+
+def get_segmenter(segmenter=None):
+    """
+    Returns the Segmenter of the given name
+    ("jieba", "max-match" or "character"), which is shared by every caller.
+    A Segmenter object is returned as it is, and None gives jieba.
+    """
+    if segmenter is None:
+        segmenter = "jieba"
+    if isinstance(segmenter, Segmenter):
+        if not segmenter.name:
+            # the name keeps its clauses apart in an AnnotationCache.
+            raise ValueError(
+                f"{type(segmenter).__qualname__} has no name. "
+                "Give the Segmenter subclass a name."
+            )
+        return segmenter
+
+    result = _segmenters.get(segmenter)
+    if result is None:
+        segmenter_class = _SEGMENTER_CLASSES.get(segmenter)
+        if segmenter_class is None:
+            names = ", ".join(f'"{n}"' for n in _SEGMENTER_CLASSES.keys())
+            raise ValueError(f'"{segmenter}" is not a segmenter. Use one of {names}.')
+        result = segmenter_class()
+        _segmenters[segmenter] = result
+    return result
@@ -95,12 +95,10 @@ def _next_syllable(
 def _update_syllable(syllable, infl: int):
     """
     Updates the given Syllable provided its true inflection.
+    Its descriptions and spoken tone follow from the inflection,
+    but its zhuyin and IPA tone marks are left as they were.
     """
-    syllable["inflection-num"] = infl
-    syllable["inflection-desc"] = TO_INFLECTION_LABEL[infl]
-    spoken = TO_SPOKEN_TONE.get(infl, infl)
-    syllable["spoken-tone-num"] = spoken
-    syllable["spoken-tone-desc"] = TO_INFLECTION_LABEL[spoken]
+    syllable.inflection_num = infl
 
 
 def inflect_yi(words: list):
@@ -192,6 +190,77 @@ def inflect_neutrals(words: list):
                     _update_syllable(syllable, infl)
 
 
+def _inflect_flat_yi(syllables: list, index: int):
+    """Inflects the Syllable at the index in the same way as inflect_yi."""
+    syllable = syllables[index]
+    if syllable.hanzi != "一":
+        return
+
+    if index > 0 and syllables[index - 1].hanzi in "第":
+        return
+
+    if index + 1 == len(syllables):
+        return
+    next_syllable = syllables[index + 1]
+    if next_syllable.hanzi in "月号零一二三四五六七八九十年":
+        return
+
+    next_tone = next_syllable["spoken-tone-num"]
+    if next_tone == FALLING_TONE_NUM:
+        _update_syllable(syllable, RISING_YI_INFLECTION)
+    elif next_tone in PRIMARY_TONES:
+        _update_syllable(syllable, FALLING_YI_INFLECTION)
+
+
+def inflect_flat_syllables(syllables: list):
+    """
+    Edits the given flat list of Syllables in-place with a single
+    left-to-right scan, giving the same result as running
+    inflect_yi, inflect_bu and then inflect_neutrals.
+
+    一 is inflected one step ahead of the scan,
+    since 不 depends on the inflection of the syllable after it.
+    """
+    if len(syllables) == 0:
+        return
+
+    _inflect_flat_yi(syllables, 0)
+    last = len(syllables) - 1
+    prev_innate_tone = None
+    for index, syllable in enumerate(syllables):
+        if index < last:
+            _inflect_flat_yi(syllables, index + 1)
+
+            # 不 changes to a rising tone before a falling tone.
+            if (
+                syllable.hanzi == "不"
+                and syllables[index + 1]["spoken-tone-num"] == FALLING_TONE_NUM
+            ):
+                _update_syllable(syllable, RISING_BU_INFLECTION)
+
+        # a neutral tone is inflected by the tone that comes before it.
+        innate_tone = syllable["innate-tone-num"]
+        if innate_tone == NEUTRAL_TONE_NUM and (
+            prev_innate_tone in PRIMARY_TONES + [NEUTRAL_TONE_NUM]
+        ):
+            _update_syllable(syllable, TO_INFLECTED_NEUTRAL[prev_innate_tone])
+        prev_innate_tone = innate_tone
+
+
+def postprocess_flat_inflections(syllables: list, word_starts: list):
+    """
+    Modifies the inflections of the flat list of Syllables of a clause
+    so that they reflect their context (see flatten_words).
+    """
+    inflect_flat_syllables(syllables)
+    apply_flat_sequential_rule(
+        syllables, word_starts, LOW_INFLECTION, RISING_LOW_INFLECTION
+    )
+    apply_flat_sequential_rule(
+        syllables, word_starts, FALLING_INFLECTION, HALF_FALLING_INFLECTION
+    )
+
+
 _PRINT_APPLY_RULE_DEBUG = False
 
 
@@ -500,3 +569,195 @@ def apply_sequential_rule(
         for j, inflection in enumerate(mark_word):
             if inflection not in [UNKNOWN, CERTAIN]:
                 words[i][j].update_inflection(inflection)
+
+
+def flatten_words(words: list):
+    """
+    Returns a flat list of the Syllables in the given Words,
+    along with a list of the index where each Word begins,
+    followed by the total number of Syllables.
+    """
+    syllables = []
+    word_starts = [0]
+    for word in words:
+        syllables.extend(word)
+        word_starts.append(len(syllables))
+    return syllables, word_starts
+
+
+def _find_flat_monosyllable_series(marks, word_starts, inflections):
+    """
+    Returns the same groupings as _find_monosyllable_series,
+    except each tuple contains:
+        - the index of the Word.
+        - the index of the mark in the flat list of <marks>.
+    """
+    series = [[]]
+    for w in range(len(word_starts) - 1):
+        start, end = word_starts[w], word_starts[w + 1]
+        if end - start == 1:
+            if marks[start] not in inflections:
+                continue
+            index = start  # a pure monosyllable.
+        elif end - start <= 1:
+            continue
+        elif marks[start] in inflections and marks[start + 1] not in inflections:
+            index = start  # isolated at the beginning of a word.
+        elif marks[end - 1] in inflections and marks[end - 2] not in inflections:
+            index = end - 1  # isolated at the end of a word.
+        else:
+            continue
+
+        current_series = series[-1]
+        if len(current_series) == 0 or current_series[-1][0] == w - 1:
+            current_series.append((w, index))  # part of the current series.
+        else:
+            series.append([(w, index)])  # starts a new series.
+    return series
+
+
+def apply_flat_sequential_rule(
+    syllables: list,
+    word_starts: list,
+    old_inflection: int,
+    new_inflection: int,
+):
+    """
+    This function applies the 2-2-3 rule exactly as apply_sequential_rule
+    does, but it works over a flat list of Syllables (see flatten_words),
+    so the neighbors of every syllable are found directly by index.
+
+    Parameters:
+    syllables (list): a flat list of the Syllable objects of a clause.
+    word_starts (list): the index where each Word begins in <syllables>,
+                        followed by the total number of Syllables.
+    old_inflection (int): the inflection number to replace.
+    new_inflection (int): the inflection number the old is replaced with.
+    """
+    CERTAIN = PUNCTUATION_TONE_NUM
+    UNKNOWN = 99  # indicates a tone which will be determined
+
+    marks = [
+        UNKNOWN if syllable.inflection_num == old_inflection else CERTAIN
+        for syllable in syllables
+    ]
+    if UNKNOWN not in marks:
+        return
+
+    n = len(marks)
+    last = n - 1
+
+    # Step 1) the last occurrence in a row remains <old_inflection>.
+    for k in range(n):
+        if marks[k] == UNKNOWN and (k == last or marks[k + 1] != UNKNOWN):
+            marks[k] = old_inflection
+
+    # Step 2) a series of UNKNOWN marks under one multisyllable word
+    #         is marked as <new_inflection>, except for the word's last mark.
+    for w in range(len(word_starts) - 1):
+        for k in range(word_starts[w], word_starts[w + 1] - 1):
+            if marks[k] == UNKNOWN:
+                marks[k] = new_inflection
+
+    # Step 3) a series of two or more monosyllable words alternates.
+    monosyllable_series = _find_flat_monosyllable_series(
+        marks, word_starts, [old_inflection, new_inflection, UNKNOWN]
+    )
+    for series in monosyllable_series:
+        if len(series) > 1:
+            changes = True
+            for i, (_, k) in enumerate(series):
+                occurrences_left = len(series) - 1 - i
+                if occurrences_left == 1 and not changes:
+                    changes = True
+
+                if marks[k] == UNKNOWN:
+                    marks[k] = new_inflection if changes else old_inflection
+
+                changes = not changes
+
+    # Step 4) an UNKNOWN mark between two known marks
+    #         becomes <new_inflection> if either of them is <old_inflection>.
+    for k in range(n):
+        if marks[k] != UNKNOWN or k == last:
+            continue
+
+        next_inflection = marks[k + 1]
+        if next_inflection == UNKNOWN:
+            continue
+
+        if k == 0:
+            if next_inflection == old_inflection:
+                marks[k] = new_inflection
+            else:
+                marks[k] = old_inflection
+        else:
+            prev_inflection = marks[k - 1]
+            if prev_inflection == UNKNOWN:
+                continue
+
+            if (
+                prev_inflection == old_inflection
+                or next_inflection == old_inflection
+            ):
+                marks[k] = new_inflection
+            else:
+                marks[k] = old_inflection
+
+    # Step 5) moving from right-to-left, an UNKNOWN mark
+    #         becomes <new_inflection> if the next mark is <old_inflection>.
+    for k in range(last, -1, -1):
+        if marks[k] != UNKNOWN:
+            continue
+
+        if k < last and marks[k + 1] == old_inflection:
+            marks[k] = new_inflection
+        else:
+            marks[k] = old_inflection
+
+    # Step 6) (CERTAIN), <new>, <new>, <old or new>
+    #         keeps its first occurrence as <new_inflection>.
+    for series in monosyllable_series:
+        if len(series) != 3:
+            continue
+
+        (w_0, k_0), (_, k_1), (_, k_2) = series
+        if (
+            marks[k_0] == new_inflection
+            and marks[k_1] == new_inflection
+            and marks[k_2] in [old_inflection, new_inflection]
+            and (w_0 == 0 or marks[word_starts[w_0] - 1] == CERTAIN)
+        ):
+            marks[k_0] = new_inflection
+
+    # Step 7) (CERTAIN), <new>, <old>, <new>, <old>
+    #         becomes (CERTAIN), <old>, <new>, <new>, <old>.
+    num_words = len(word_starts) - 1
+    for series in monosyllable_series:
+        if len(series) != 4:
+            continue
+
+        (w_0, k_0), (_, k_1), (_, k_2), (w_3, k_3) = series
+        next_start = word_starts[w_3 + 1] if w_3 + 1 < num_words else None
+        if (
+            marks[k_0] == new_inflection
+            and marks[k_1] == old_inflection
+            and marks[k_2] == new_inflection
+            and marks[k_3] == old_inflection
+            and (w_0 == 0 or marks[word_starts[w_0] - 1] == CERTAIN)
+            and (
+                next_start is None
+                or (
+                    word_starts[w_3 + 2] - next_start == 1
+                    and marks[next_start] == CERTAIN
+                )
+                or marks[next_start] != new_inflection
+            )
+        ):
+            marks[k_0] = old_inflection
+            marks[k_1] = new_inflection
+
+    # Result) copies the inflections back.
+    for syllable, inflection in zip(syllables, marks):
+        if inflection != CERTAIN:
+            syllable.update_inflection(inflection)
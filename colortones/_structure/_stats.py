@@ -0,0 +1,135 @@
+"""
+Filename: _stats.py
+Description: This file contains functionality to time each stage
+             of processing and rendering text while it's enabled.
+
+Author: TravisGK
+Version: 1.0
+
+License: GNU License
+"""
+
+import functools
+import threading
+import time
+from ._phonetics._inflections import TO_INFLECTION_LABEL
+
+# binds the name of each stage to [number of calls, total seconds].
+_timers = {}
+
+# binds (owner, attribute name) to the original function
+# of every function that's been replaced with a timed one.
+_originals = {}
+
+# called with the name of the stage and the seconds of each timed call.
+_callback = None
+
+# stages may be timed from several threads at once, such as those of aprocess_text.
+_lock = threading.Lock()
+
+
+def _sequential_rule_name(args):
+    """Names a call to apply_flat_sequential_rule by the inflection it replaces."""
+    return "sequential-rule-" + TO_INFLECTION_LABEL[args[2]]
+
+
+def _get_stages():
+    """
+    Returns a list of (owner, attribute name, stage name) of every function
+    that's timed, where the stage name may instead be a function
+    that names the stage from the arguments of the call.
+    """
+    from . import _lexicon, _paragraph, _segmenter, _sequential_rules
+
+    return [
+        (_paragraph, "_annotate_clause_strs", "annotation"),
+        (_lexicon.Lexicon, "segment", "segmentation"),
+        (_segmenter.Segmenter, "segment_all", "segmentation"),
+        (_segmenter.JiebaSegmenter, "segment_all", "segmentation"),
+        (_lexicon.Lexicon, "romanize", "romanization"),
+        (_paragraph, "_make_syllable", "syllables"),
+        (_sequential_rules, "inflect_flat_syllables", "inflect-syllables"),
+        (_sequential_rules, "apply_flat_sequential_rule", _sequential_rule_name),
+        (_paragraph.Paragraph, "_join_clauses", "joining"),
+        (_paragraph, "_render", "rendering"),
+        (_paragraph.Paragraph, "_write_color_range", "rendering"),
+    ]
+
+
+def _record(name: str, seconds: float):
+    with _lock:
+        timer = _timers.get(name)
+        if timer is None:
+            _timers[name] = [1, seconds]
+        else:
+            timer[0] += 1
+            timer[1] += seconds
+    callback = _callback
+    if callback is not None:
+        callback(name, seconds)
+
+
+def _make_timed(function, name):
+    """Returns a function that records the time of each call to the function."""
+
+    @functools.wraps(function)
+    def timed(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            stage = name(args) if callable(name) else name
+            _record(stage, time.perf_counter() - start)
+
+    return timed
+
+
+def enable_stats(callback=None):
+    """
+    Starts timing each stage of processing and rendering text.
+
+    The stages are replaced with timed versions only while stats are
+    enabled, so there's no cost at all once they're disabled.
+    Stages that call other stages (such as "annotation") include
+    the time of those stages. Work done in worker processes isn't timed.
+
+    Parameters:
+    callback (function): if given, this is called with the name of the stage
+                         and the number of seconds after every timed call.
+    """
+    global _callback
+    _callback = callback
+    if len(_originals) > 0:
+        return  # already enabled.
+
+    for owner, attribute, name in _get_stages():
+        original = vars(owner)[attribute]
+        _originals[(owner, attribute)] = original
+        setattr(owner, attribute, _make_timed(original, name))
+
+
+def disable_stats():
+    """Stops timing the stages, keeping the stats that have been gathered."""
+    global _callback
+    _callback = None
+    for (owner, attribute), original in _originals.items():
+        setattr(owner, attribute, original)
+    _originals.clear()
+
+
+def stats():
+    """
+    Returns a dictionary that binds the name of each timed stage
+    to its number of "calls" and total "seconds".
+    """
+    with _lock:
+        return {
+            name: {"calls": calls, "seconds": seconds}
+            for name, (calls, seconds) in sorted(_timers.items())
+        }
+
+
+def reset_stats():
+    """Clears the stats that have been gathered."""
+    with _lock:
+        _timers.clear()
@@ -0,0 +1,124 @@
+"""
+Filename: _stream.py
+Description: This file contains functionality to annotate text incrementally
+             from a file or any other source of strings.
+
+Author: TravisGK
+Version: 1.0
+
+License: GNU License
+"""
+
+import re
+from ._phonetics._tones import CLAUSE_BREAKERS, SENTENCE_ENDERS
+from ._lexicon import DEFAULT_LEXICON
+from ._paragraph import Paragraph
+
+# the number of characters read from a file at a time.
+DEFAULT_CHUNK_SIZE = 1 << 16
+
+_PUNCT_CLASS = re.escape(CLAUSE_BREAKERS + SENTENCE_ENDERS)
+
+# matches the position directly after a run of sentence enders
+# that is followed by the start of a new clause.
+# clauses are never joined across these positions,
+# so the text before one can be annotated on its own.
+_SAFE_CUT_PATTERN = re.compile(
+    f"(?<=[{re.escape(SENTENCE_ENDERS)}])(?=\\s*[^\\s{_PUNCT_CLASS}])"
+)
+
+
+def _find_undecided_tail(pending: str):
+    """
+    Returns the index where the trailing punctuation and whitespace begins,
+    since a cut in there might only become safe once more text arrives.
+    """
+    index = len(pending)
+    while index > 0 and (
+        pending[index - 1].isspace()
+        or pending[index - 1] in CLAUSE_BREAKERS + SENTENCE_ENDERS
+    ):
+        index -= 1
+    return index
+
+
+class _TextCutter:
+    """
+    A _TextCutter gathers text as it arrives
+    and cuts off the text before the last safe cut,
+    which can then be annotated on its own.
+    """
+
+    def __init__(self):
+        self._pending = ""
+        self._scan_start = 0
+        self._is_start = True
+
+    def feed(self, chunk: str):
+        """Adds the chunk and returns the text that can be annotated, or None."""
+        chunk = chunk.replace("\n", " ")
+        if self._is_start:
+            chunk = chunk.lstrip()
+            self._is_start = len(chunk) == 0
+        pending = self._pending + chunk
+
+        # only the text that's arrived since the last safe cut is searched.
+        cut = None
+        for match in _SAFE_CUT_PATTERN.finditer(pending, self._scan_start):
+            cut = match.start()
+
+        text_str = None
+        if cut is not None:
+            text_str = pending[:cut]
+            pending = pending[cut:]
+        self._pending = pending
+        self._scan_start = _find_undecided_tail(pending)
+        return text_str
+
+    def finish(self):
+        """Returns the rest of the text, or None if there's none."""
+        pending = self._pending.rstrip()
+        self._pending = ""
+        return pending if len(pending) > 0 else None
+
+
+def _iter_chunks(source, chunk_size: int):
+    """Yields strings from a text file object, a string or an iterable."""
+    if isinstance(source, str):
+        yield source
+    elif hasattr(source, "read"):
+        yield from iter(lambda: source.read(chunk_size), "")
+    else:
+        yield from source
+
+
+def iter_sentences(
+    source,
+    lexicon=DEFAULT_LEXICON,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    cache=None,
+):
+    """
+    Yields the sentences (Clause objects) of the text as soon as
+    they are finished, holding only the unfinished text in memory.
+
+    Parameters:
+    source: a text file object, or an iterable of strings (such as lines).
+    lexicon (Lexicon): segments and romanizes the clauses.
+    chunk_size (int): the number of characters read at a time from a file.
+    cache (AnnotationCache): if given, clauses are read from and added to it.
+
+    Returns:
+    generator: the same sentences that process_text would give.
+    """
+    cutter = _TextCutter()
+    for chunk in _iter_chunks(source, chunk_size):
+        text_str = cutter.feed(chunk)
+        if text_str is not None:
+            yield from Paragraph(text_str, lexicon, cache=cache)
+
+    text_str = cutter.finish()
+    if text_str is not None:
+        yield from Paragraph(text_str, lexicon, cache=cache)
+    if cache is not None:
+        cache.flush()
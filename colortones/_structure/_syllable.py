@@ -9,9 +9,16 @@ Version: 1.0
 License: GNU License
 """
 
+import collections
+import functools
+import sys
 from ._phonetics._inflections import *
 from ._phonetics._transcription import to_zhuyin_and_ipa
 
+# the number of distinct pinyin syllables whose transcriptions are cached.
+# Mandarin has around 1,300 distinct syllables once tones are counted.
+DEFAULT_CACHE_SIZE = 4096
+
 
 def _get_zhuyin_marker(spoken_tone_num):
     """Returns the prefix and suffix for zhuyin, given the spoken tone."""
@@ -26,65 +33,154 @@ def _get_zhuyin_marker(spoken_tone_num):
     return ("", "")
 
 
+# the prefix and suffix used for zhuyin, for every inflection.
+_TO_ZHUYIN_MARKER = {
+    infl: _get_zhuyin_marker(TO_SPOKEN_TONE.get(infl, infl))
+    for infl in TO_INFLECTION_LABEL.keys()
+}
+
+
+class _Transcription(
+    collections.namedtuple(
+        "_Transcription",
+        ["pinyin", "pinyin_toneless", "zhuyin_root", "ipa_root", "tone_num"],
+    )
+):
+    """
+    A _Transcription holds the information of a syllable that only depends on
+    its pinyin, so it can be shared by every Syllable with that pinyin.
+    """
+
+    __slots__ = ()
+
+
 class Syllable:
     """
     A Syllable contains various pronunciation and transcription information.
+
+    Only the hanzi, a shared _Transcription and the inflections
+    are stored; every other value is looked up from the inflection tables
+    when it's accessed with syllable[key].
     """
 
-    def __init__(self, data):
-        self.data = data
+    __slots__ = ("hanzi", "transcription", "inflection_num", "_marked_num", "_extra")
+
+    def __init__(self, hanzi: str, transcription: _Transcription):
+        self.hanzi = hanzi
+        self.transcription = transcription
+        self.inflection_num = transcription.tone_num
+
+        # the inflection which the zhuyin and IPA tone marks are written for.
+        # the rules for 一, 不 and neutral tones only change the inflection.
+        self._marked_num = transcription.tone_num
+
+        # holds any other values that have been set on this Syllable.
+        self._extra = None
 
     def __getitem__(self, key):
-        return self.data[key]
+        if self._extra is not None and key in self._extra:
+            return self._extra[key]
+        return _TO_VALUE[key](self)
 
     def __setitem__(self, key, value):
-        self.data[key] = value
+        if key == "inflection-num":
+            self.inflection_num = value
+        else:
+            if self._extra is None:
+                self._extra = {}
+            self._extra[key] = value
+
+    @property
+    def data(self):
+        """Returns a dictionary of all the Syllable's information."""
+        return {key: self[key] for key in _TO_VALUE.keys()}
 
     def is_punct(self):
-        return self.data["inflection-num"] == PUNCTUATION_INFLECTION
+        return self.inflection_num == PUNCTUATION_INFLECTION
 
     def update_inflection(self, inflection_num: int):
-        spoken_tone_num = TO_SPOKEN_TONE.get(inflection_num, inflection_num)
-        zh = _get_zhuyin_marker(spoken_tone_num)
-        self.data["zhuyin-prefix"], self.data["zhuyin-suffix"] = zh
-        self.data["zhuyin"] = zh[0] + self.data["zhuyin-root"] + zh[1]
-        self.data["ipa-suffix"] = TO_IPA_SUFFIX.get(inflection_num, "")
-        self.data["ipa"] = self.data["ipa-root"] + self.data["ipa-suffix"]
-        self.data["inflection-desc"] = TO_INFLECTION_LABEL[inflection_num]
-        self.data["spoken-tone-desc"] = TO_INFLECTION_LABEL[spoken_tone_num]
-        self.data["inflection-num"] = inflection_num
-        self.data["spoken-tone-num"] = spoken_tone_num
+        self.inflection_num = inflection_num
+        self._marked_num = inflection_num
 
 
-def _make_syllable(hanzi: str, pinyin: str):
-    """Returns a Syllable object of the syllable's information."""
-    inflection_num = get_tone_num(pinyin)  # assuming 5 is neutral (? UNCERTAIN)
-    spoken_tone_num = TO_SPOKEN_TONE.get(inflection_num, inflection_num)
-    innate_tone_num = TO_INNATE_TONE.get(inflection_num, inflection_num)
+def _spoken_tone(syllable):
+    return TO_SPOKEN_TONE.get(syllable.inflection_num, syllable.inflection_num)
+
+
+def _innate_tone(syllable):
+    tone_num = syllable.transcription.tone_num
+    return TO_INNATE_TONE.get(tone_num, tone_num)
+
+
+def _zhuyin(syllable):
+    prefix, suffix = _TO_ZHUYIN_MARKER[syllable._marked_num]
+    return prefix + syllable.transcription.zhuyin_root + suffix
+
 
+def _ipa(syllable):
+    suffix = TO_IPA_SUFFIX.get(syllable._marked_num, "")
+    return syllable.transcription.ipa_root + suffix
+
+
+# returns the value of each key of a Syllable.
+_TO_VALUE = {
+    "hanzi": lambda s: s.hanzi,
+    "pinyin": lambda s: s.transcription.pinyin,
+    "pinyin-toneless": lambda s: s.transcription.pinyin_toneless,
+    "zhuyin": _zhuyin,
+    "zhuyin-prefix": lambda s: _TO_ZHUYIN_MARKER[s._marked_num][0],
+    "zhuyin-root": lambda s: s.transcription.zhuyin_root,
+    "zhuyin-suffix": lambda s: _TO_ZHUYIN_MARKER[s._marked_num][1],
+    "ipa": _ipa,
+    "ipa-root": lambda s: s.transcription.ipa_root,
+    "ipa-suffix": lambda s: TO_IPA_SUFFIX.get(s._marked_num, ""),
+    "inflection-desc": lambda s: TO_INFLECTION_LABEL[s.inflection_num],
+    "spoken-tone-desc": lambda s: TO_INFLECTION_LABEL[_spoken_tone(s)],
+    "innate-tone-desc": lambda s: TO_INFLECTION_LABEL[_innate_tone(s)],
+    "inflection-num": lambda s: s.inflection_num,
+    "spoken-tone-num": _spoken_tone,
+    "innate-tone-num": _innate_tone,
+}
+
+
+def _transcribe(pinyin: str):
+    """Returns a _Transcription of the syllable's pinyin."""
     pinyin_no_marker = strip_tone_marker(pinyin)
     zhuyin_root, ipa_root = to_zhuyin_and_ipa(pinyin_no_marker)
+    tone_num = get_tone_num(pinyin)  # assuming 5 is neutral (? UNCERTAIN)
+    return _Transcription(pinyin, pinyin_no_marker, zhuyin_root, ipa_root, tone_num)
 
-    zhuyin_prefix, zhuyin_suffix = _get_zhuyin_marker(spoken_tone_num)
-    ipa_suffix = TO_IPA_SUFFIX.get(inflection_num, "")
-
-    return Syllable(
-        {
-            "hanzi": hanzi,
-            "pinyin": pinyin,
-            "pinyin-toneless": pinyin_no_marker,
-            "zhuyin": zhuyin_prefix + zhuyin_root + zhuyin_suffix,
-            "zhuyin-prefix": zhuyin_prefix,
-            "zhuyin-root": zhuyin_root,
-            "zhuyin-suffix": zhuyin_suffix,
-            "ipa": ipa_root + ipa_suffix,
-            "ipa-root": ipa_root,
-            "ipa-suffix": ipa_suffix,
-            "inflection-desc": TO_INFLECTION_LABEL[inflection_num],
-            "spoken-tone-desc": TO_INFLECTION_LABEL[spoken_tone_num],
-            "innate-tone-desc": TO_INFLECTION_LABEL[innate_tone_num],
-            "inflection-num": inflection_num,
-            "spoken-tone-num": spoken_tone_num,
-            "innate-tone-num": innate_tone_num,
-        }
-    )
+
+_cached_transcribe = functools.lru_cache(maxsize=DEFAULT_CACHE_SIZE)(_transcribe)
+
+
+def set_syllable_cache_size(maxsize):
+    """
+    Replaces the syllable cache with an empty one of the given size.
+    A size of None lets the cache grow without bound.
+    """
+    global _cached_transcribe
+    _cached_transcribe = functools.lru_cache(maxsize=maxsize)(_transcribe)
+
+
+def syllable_cache_info():
+    """Returns the hits, misses, maximum size and current size of the cache."""
+    return _cached_transcribe.cache_info()
+
+
+def clear_syllable_cache():
+    """Empties the syllable cache and resets its counters."""
+    _cached_transcribe.cache_clear()
+
+
+def _make_syllable(hanzi: str, pinyin: str):
+    """Returns a Syllable object of the syllable's information."""
+    return Syllable(sys.intern(hanzi), _cached_transcribe(pinyin))
+
+
+def _restore_syllable(hanzi: str, pinyin: str, inflection_num: int, marked_num: int):
+    """Returns a Syllable object with inflections that were already found."""
+    syllable = Syllable(hanzi, _cached_transcribe(pinyin))
+    syllable.inflection_num = inflection_num
+    syllable._marked_num = marked_num
+    return syllable
@@ -1,3 +1,4 @@
+import collections
 import colorsys
 import json
 import os
@@ -21,91 +22,270 @@ def _RGB_to_hex(rgb):
     return "#{:02x}{:02x}{:02x}".format(*rgb)
 
 
-def _determine_color_embedding(rgb):
-    OPTIONS = {
-        (197, 15, 31): "\033[31m",  # red
-        (19, 161, 14): "\033[32m",  # green
-        (193, 156, 0): "\033[33m",  # yellow
-        (0, 44, 173): "\033[34m",  # blue
-        (136, 23, 152): "\033[35m",  # purple
-        (0, 138, 113): "\033[36m",  # cyan
-        (255, 255, 255): "\033[37m",  # white
-        (113, 113, 113): "\033[90m",  # gray
-    }
+# the escape codes of the 8 console colors, bound to their RGB values.
+_ANSI_OPTIONS = {
+    (197, 15, 31): "\033[31m",  # red
+    (19, 161, 14): "\033[32m",  # green
+    (193, 156, 0): "\033[33m",  # yellow
+    (0, 44, 173): "\033[34m",  # blue
+    (136, 23, 152): "\033[35m",  # purple
+    (0, 138, 113): "\033[36m",  # cyan
+    (255, 255, 255): "\033[37m",  # white
+    (113, 113, 113): "\033[90m",  # gray
+}
+ANSI_NEUTRAL = "\033[90m"
+
+# the HSV value of each console color, built once.
+_ANSI_HSV_OPTIONS = [
+    (_RGB_to_HSV(rgb), code) for rgb, code in _ANSI_OPTIONS.items()
+]
+
+# the levels of each channel in the 6x6x6 cube of 256-color terminals,
+# and the nearest level of the cube for every possible channel value.
+_CUBE_LEVELS = (0, 95, 135, 175, 215, 255)
+_TO_CUBE_INDEX = [
+    min(range(6), key=lambda i: abs(_CUBE_LEVELS[i] - v)) for v in range(256)
+]
+
+# the levels of the 24 grays of 256-color terminals (colors 232 to 255),
+# and the nearest gray for every possible channel value.
+_GRAY_LEVELS = tuple(8 + 10 * i for i in range(24))
+_TO_GRAY_INDEX = [
+    min(range(24), key=lambda i: abs(_GRAY_LEVELS[i] - v)) for v in range(256)
+]
+
+COLOR_MODES = ("ansi", "256", "truecolor")
+
 
-    options_hsv_to_rgb = {}
-    for key in OPTIONS.keys():
-        hsv_key = _RGB_to_HSV(key)
-        options_hsv_to_rgb[hsv_key] = key
+def detect_color_mode():
+    """
+    Returns the best color mode the console supports,
+    going by the COLORTERM and TERM environment variables.
+    """
+    if os.environ.get("COLORTERM", "").lower() in ("truecolor", "24bit"):
+        return "truecolor"
+    if "256color" in os.environ.get("TERM", ""):
+        return "256"
+    return "ansi"
+
+
+def _squared_distance(color1, color2):
+    return sum((c1 - c2) ** 2 for c1, c2 in zip(color1, color2))
 
-    def euclidean_distance(color1, color2):
-        return sum((c1 - c2) ** 2 for c1, c2 in zip(color1, color2)) ** 0.5
 
+def _determine_color_embedding(rgb):
+    """Returns the escape code of the console color closest to the RGB."""
     hsv = _RGB_to_HSV(rgb)
-    closest_hsv = min(
-        options_hsv_to_rgb.keys(),
-        key=lambda color: euclidean_distance(hsv, color),
+    _, code = min(
+        _ANSI_HSV_OPTIONS,
+        key=lambda option: _squared_distance(hsv, option[0]),
     )
-    closest_color = options_hsv_to_rgb[closest_hsv]
-    return OPTIONS[closest_color]
+    return code
+
+
+def _determine_256_color_embedding(rgb):
+    """Returns the escape code of the 256-color closest to the RGB."""
+    r, g, b = (_TO_CUBE_INDEX[c] for c in rgb)
+    cube_rgb = (_CUBE_LEVELS[r], _CUBE_LEVELS[g], _CUBE_LEVELS[b])
+    gray_i = _TO_GRAY_INDEX[sum(rgb) // 3]
+    gray_rgb = (_GRAY_LEVELS[gray_i],) * 3
+
+    if _squared_distance(rgb, gray_rgb) < _squared_distance(rgb, cube_rgb):
+        index = 232 + gray_i
+    else:
+        index = 16 + 36 * r + 6 * g + b
+    return f"\033[38;5;{index}m"
+
+
+def _determine_truecolor_embedding(rgb):
+    """Returns the escape code that shows the exact RGB."""
+    return "\033[38;2;{};{};{}m".format(*rgb)
+
+
+# the colors used if no scheme can be found at all.
+_FALLBACK = {
+    "high-color": [255, 157, 18],
+    "rising-color": [0, 190, 36],
+    "low-color": [0, 87, 190],
+    "falling-color": [176, 111, 219],
+    "neutral-color": [128, 128, 128],
+}
+
+_CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+_SCHEMES_PATH = os.path.join(_CURRENT_DIR, "_schemes.json")
+
+# binds the path of each schemes file to the (mtime, size) it was read at
+# (None if it hasn't been read, False if it was missing) and its schemes.
+# _schemes.json comes first, and schemes in files added later take precedence.
+_scheme_files = {_SCHEMES_PATH: (None, {})}
+
+# every registered scheme, or None if they need to be gathered again.
+_all_schemes = None
+
+# schemes registered from code, which take precedence over any file.
+_custom_schemes = {}
+
+# the greatest number of finished color schemes that are kept.
+# the interpolations can be any number, so the least recently used are dropped.
+_MAX_COMPUTED_SCHEMES = 256
+
+# binds (name, neutral interp., rising-low interp., color mode)
+# to the finished color scheme, from least to most recently used.
+_computed_schemes = collections.OrderedDict()
+
+
+def _get_all_schemes():
+    """
+    Returns a dictionary of every registered scheme's colors,
+    first rereading any schemes file that's changed since it was read.
+    """
+    global _all_schemes
+    changed = False
+    for path, (stamp, schemes) in _scheme_files.items():
+        try:
+            stat = os.stat(path)
+            new_stamp = (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            new_stamp = False
+
+        if new_stamp == stamp:
+            continue
+        changed = True
+        if new_stamp is False:
+            if path == _SCHEMES_PATH:
+                print(f"Could not find the color schemes file at {path}")
+            _scheme_files[path] = (False, {})
+        else:
+            with open(path, "r") as file:
+                schemes = json.load(file)
+            schemes = {name.lower(): colors for name, colors in schemes.items()}
+            _scheme_files[path] = (new_stamp, schemes)
+
+    if changed or _all_schemes is None:
+        _all_schemes = {}
+        for _, schemes in _scheme_files.values():
+            _all_schemes.update(schemes)
+        _all_schemes.update(_custom_schemes)
+        _computed_schemes.clear()
+    return _all_schemes
+
+
+def register_color_scheme(scheme_name: str, colors: dict):
+    """
+    Registers a color scheme so that it can be loaded by name,
+    replacing any scheme that has the same name.
+
+    Parameters:
+    scheme_name (str): the name of the new color scheme.
+    colors (dict): binds "high-color", "rising-color", "low-color",
+                   "falling-color" and "neutral-color" to RGB values.
+    """
+    missing = [key for key in _FALLBACK.keys() if key not in colors]
+    if len(missing) > 0:
+        raise ValueError(f"The color scheme is missing {missing}")
+
+    global _all_schemes
+    _custom_schemes[scheme_name.lower()] = {
+        key: [int(c) for c in colors[key]] for key in _FALLBACK.keys()
+    }
+    _all_schemes = None  # forces the schemes to be gathered again.
+
+
+def add_color_scheme_file(path: str):
+    """
+    Registers every color scheme in a JSON file that's formatted
+    like _schemes.json. The file is reread whenever it changes.
+    """
+    global _all_schemes
+    path = os.path.abspath(path)
+    with open(path, "r") as file:
+        json.load(file)  # raises an error now if the file is invalid.
+    _scheme_files[path] = (None, {})
+    _all_schemes = None
+
+
+def reload_color_schemes():
+    """Forgets every loaded scheme so that all schemes files are reread."""
+    global _all_schemes
+    for path in _scheme_files.keys():
+        _scheme_files[path] = (None, {})
+    _all_schemes = None
 
 
 def load_color_scheme(
     scheme_name: str,
     neutral_interpolation=0.5,
     rising_low_interpolation=0.5,
+    color_mode: str = None,
 ):
     """
     Returns a dictionary that binds each inflection value
     to a tuple that contains an RGB color, a HEX conversion,
     and an escape code for showing the color in the console.
 
+    Schemes are computed once for each set of arguments
+    and are reused until a schemes file changes.
+
     Parameters:
-    scheme_name (str): name of the color scheme in _schemes.json to be used.
+    scheme_name (str): name of the color scheme in _schemes.json,
+                       in an added schemes file or registered from code.
     neutral_interpolation (num): 0.0 will make all inflected neutrals
                                  be the neutral color.
                                  1.0 will make all inflected neutrals
                                  match their preceding inflections exactly.
     rising_low_interpolation (num): 0.0 will make rising lows the low color.
                                     1.0 will make rising lows the rising color.
+    color_mode (str): "ansi" for the 8 basic console colors,
+                      "256" for 256-color consoles,
+                      or "truecolor" for consoles that show any RGB.
+                      If None, the mode is detected from the environment.
 
     Returns:
     dict: binds each inflection value to a tuple
           that contains an RGB color and a HEX conversion.
     """
-    FALLBACK = {
-        "high-color": [255, 157, 18],
-        "rising-color": [0, 190, 36],
-        "low-color": [0, 87, 190],
-        "falling-color": [176, 111, 219],
-        "neutral-color": [128, 128, 128],
-    }
+    if color_mode is None:
+        color_mode = detect_color_mode()
+    elif color_mode not in COLOR_MODES:
+        msg = f'color_mode must be one of {COLOR_MODES}, not "{color_mode}"'
+        raise ValueError(msg)
 
     """
-    Step 1) Attempts to load the dictionary of all color schemes.
+    Step 1) Finds the colors of the scheme among all registered schemes.
     """
-    current_dir = os.path.dirname(os.path.abspath(__file__))
-    schemes_path = os.path.join(current_dir, "_schemes.json")
-    if not os.path.exists(schemes_path):
-        # defaults if the schemes file can't be found.
-        print(f"Could not find the color schemes file at {schemes_path}")
-        scheme = FALLBACK
+    all_schemes = _get_all_schemes()
+    name = scheme_name.lower()
+    if len(all_schemes) == 0:
+        name = None  # uses the fallback colors.
+    elif name not in all_schemes:
+        print(f'Could not find the color scheme named "{scheme_name}"')
+        name = "default"
+        if name not in all_schemes:
+            print("No standard scheme was found either.")
+            name = None
+
+    key = (name, neutral_interpolation, rising_low_interpolation, color_mode)
+    result = _computed_schemes.get(key)
+    if result is None:
+        colors = _FALLBACK if name is None else all_schemes[name]
+        result = _build_color_scheme(
+            colors, neutral_interpolation, rising_low_interpolation, color_mode
+        )
+        _computed_schemes[key] = result
+        if len(_computed_schemes) > _MAX_COMPUTED_SCHEMES:
+            _computed_schemes.popitem(last=False)
     else:
-        # loads the contents of the file as a dictionary.
-        with open(schemes_path, "r") as file:
-            all_schemes = json.load(file)
+        _computed_schemes.move_to_end(key)
+    return dict(result)  # copied so that callers can't alter the cache.
+
 
-        scheme = all_schemes.get(scheme_name.lower())
-        if scheme is None:
-            msg = "Could not find the color scheme named"
-            print(f'{msg} "{scheme_name}" in {schemes_path}')
-            scheme = all_schemes.get("default")
-            if scheme is None:
-                print("No standard scheme was found either.")
-                scheme = FALLBACK
+def _build_color_scheme(
+    scheme, neutral_interpolation, rising_low_interpolation, color_mode
+):
+    """Returns a new color scheme made from the colors of the scheme."""
 
     """
-    Step 2) Extrapolates colors for every inflection from the color scheme.
+    Step 1) Extrapolates colors for every inflection from the color scheme.
     """
     scheme = {key: tuple(value) for key, value in scheme.items()}  # -> tuples.
     scheme["fallback-color"] = (255, 255, 255)
@@ -139,17 +319,22 @@ def load_color_scheme(
     }
 
     """
-    Step 3) Adds the hex and escape ANSI to each entry.
+    Step 2) Adds the hex and escape ANSI to each entry.
     """
+    if color_mode == "truecolor":
+        embed = _determine_truecolor_embedding
+    elif color_mode == "256":
+        embed = _determine_256_color_embedding
+    else:
+        embed = None
+
     for key, value in result.items():
-        result[key] = (
-            value,
-            _RGB_to_hex(value),
-            (
-                _determine_color_embedding(value)
-                if not inflection_is_neutral(key)
-                else "\033[90m"
-            ),
-        )
+        if embed is not None:
+            escape_code = embed(value)
+        elif inflection_is_neutral(key):
+            escape_code = ANSI_NEUTRAL  # too few colors to tell neutrals apart.
+        else:
+            escape_code = _determine_color_embedding(value)
+        result[key] = (value, _RGB_to_hex(value), escape_code)
 
     return result
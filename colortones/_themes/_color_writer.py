@@ -0,0 +1,56 @@
+"""
+Filename: _color_writer.py
+Description: This file defines the ColorWriter, which builds colored text
+             for the console without repeating unchanged colors.
+
+Author: TravisGK
+Version: 1.0
+
+License: GNU License
+"""
+
+RESET = "\033[0m"
+
+# the number of pieces of text held before they're written to a file.
+_FLUSH_SIZE = 4096
+
+
+class ColorWriter:
+    """
+    A ColorWriter collects pieces of colored text,
+    only writing a color's escape code when the color changes
+    and resetting the color once at the very end.
+
+    If it's given a file, the text is written to it in batches;
+    otherwise the text is kept so that it can be returned as a string.
+    """
+
+    def __init__(self, file=None):
+        self.file = file
+        self.pieces = []
+        self.color = None
+
+    def write(self, text: str, color: str = None):
+        """Writes the text in the color, or in the current color if None."""
+        if color is not None and color != self.color:
+            self.pieces.append(color)
+            self.color = color
+        self.pieces.append(text)
+        if self.file is not None and len(self.pieces) >= _FLUSH_SIZE:
+            self.flush()
+
+    def finish(self):
+        """Resets the color and writes any remaining text to the file."""
+        if self.color is not None:
+            self.pieces.append(RESET)
+            self.color = None
+        if self.file is not None:
+            self.flush()
+
+    def flush(self):
+        self.file.write("".join(self.pieces))
+        self.pieces.clear()
+
+    def getvalue(self):
+        """Returns all of the text that's been written."""
+        return "".join(self.pieces)
@@ -0,0 +1,193 @@
+"""
+Filename: _html.py
+Description: This file contains functionality to export colored text
+             as HTML (with ruby annotations) and as SVG.
+
+Author: TravisGK
+Version: 1.0
+
+License: GNU License
+"""
+
+import html
+from colortones._structure._phonetics._inflections import *
+
+
+def _class_name(inflection_num: int):
+    """Returns the short CSS class name used for an inflection."""
+    return f"t{inflection_num}"
+
+
+def _stylesheet(color_scheme, scope: str, prop: str):
+    """
+    Returns CSS rules that color every inflection with its hex value.
+    Punctuation is left to inherit the page's own color.
+    """
+    rules = []
+    for inflection_num, label in TO_INFLECTION_LABEL.items():
+        if inflection_num == PUNCTUATION_INFLECTION:
+            continue
+        hex_color = color_scheme[inflection_num][1]
+        name = _class_name(inflection_num)
+        rules.append(f"{scope}.{name}{{{prop}:{hex_color}}} /* {label} */")
+    return "\n".join(rules)
+
+
+def _iter_syllables(clause):
+    for word in clause:
+        yield from word
+
+
+def write_html(
+    sentences,
+    file,
+    color_scheme,
+    annotation: str = None,
+    standalone: bool = True,
+):
+    """
+    Writes the sentences as HTML to the file, one sentence at a time.
+    The colors are defined once in a stylesheet, which is referred to
+    by class, and neighboring hanzi of the same color share one element.
+
+    Parameters:
+    sentences: a Paragraph or any iterable of Clauses (see iter_sentences).
+    file: a text file object to write to.
+    color_scheme (dict): a color scheme from load_color_scheme.
+    annotation (str): the key of a transcription to write above each
+                      hanzi using <ruby>, such as "pinyin" or "zhuyin".
+                      If None, only the hanzi are written.
+    standalone (bool): if True, a full HTML document is written;
+                       otherwise just the <style> and <p> elements.
+    """
+    if standalone:
+        file.write('<!DOCTYPE html>\n<html>\n<head>\n<meta charset="utf-8">\n')
+    file.write("<style>\n")
+    file.write(_stylesheet(color_scheme, ".colortones ", "color"))
+    file.write("\n</style>\n")
+    if standalone:
+        file.write("</head>\n<body>\n")
+    file.write('<p class="colortones">')
+
+    for clause in sentences:
+        pieces = []
+        if annotation is None:
+            current_class = None
+            for syllable in _iter_syllables(clause):
+                if syllable.is_punct():
+                    name = None
+                else:
+                    name = _class_name(syllable["inflection-num"])
+
+                if name != current_class:
+                    if current_class is not None:
+                        pieces.append("</span>")
+                    if name is not None:
+                        pieces.append(f'<span class="{name}">')
+                    current_class = name
+                pieces.append(html.escape(syllable["hanzi"]))
+
+            if current_class is not None:
+                pieces.append("</span>")
+        else:
+            for syllable in _iter_syllables(clause):
+                hanzi = html.escape(syllable["hanzi"])
+                if syllable.is_punct():
+                    pieces.append(hanzi)
+                else:
+                    name = _class_name(syllable["inflection-num"])
+                    rt = html.escape(syllable[annotation])
+                    pieces.append(f'<ruby class="{name}">{hanzi}<rt>{rt}</rt></ruby>')
+        file.write("".join(pieces))
+
+    file.write("</p>\n")
+    if standalone:
+        file.write("</body>\n</html>\n")
+
+
+def write_svg(
+    sentences,
+    file,
+    color_scheme,
+    annotation: str = None,
+    font_size: int = 24,
+    line_length: int = 40,
+):
+    """
+    Writes the sentences as an SVG image to the file,
+    wrapping the hanzi every <line_length> characters
+    and starting every sentence on a new line.
+
+    Parameters:
+    sentences: a Paragraph or a list of Clauses.
+               these are gone through twice in order to size the image.
+    file: a text file object to write to.
+    color_scheme (dict): a color scheme from load_color_scheme.
+    annotation (str): the key of a transcription to write above each hanzi.
+    font_size (int): the size of each hanzi in pixels.
+    line_length (int): the greatest number of hanzi written on a line.
+    """
+    small_size = font_size // 2
+    line_height = font_size * 3 // 2
+    if annotation is not None:
+        line_height += small_size
+
+    # counts the lines first, since the image size comes first.
+    num_lines = 0
+    for clause in sentences:
+        num_syllables = sum(len(word) for word in clause)
+        num_lines += max(1, -(-num_syllables // line_length))
+
+    width = font_size * line_length
+    height = line_height * num_lines
+    file.write(
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" '
+        f'height="{height}" font-size="{font_size}">\n<style>\n'
+    )
+    file.write(_stylesheet(color_scheme, "", "fill"))
+    file.write(f"\n.a{{font-size:{small_size}px;text-anchor:middle}}\n</style>\n")
+
+    line_i = 0
+    for clause in sentences:
+        syllables = list(_iter_syllables(clause))
+        for start in range(0, max(1, len(syllables)), line_length):
+            line = syllables[start : start + line_length]
+            baseline = line_i * line_height + font_size
+            if annotation is not None:
+                baseline += small_size
+
+            # writes the hanzi with each run of one color in a single <tspan>.
+            pieces = [f'<text x="0" y="{baseline}">']
+            current_class = None
+            for syllable in line:
+                name = None
+                if not syllable.is_punct():
+                    name = _class_name(syllable["inflection-num"])
+                if name != current_class:
+                    if current_class is not None:
+                        pieces.append("</tspan>")
+                    if name is not None:
+                        pieces.append(f'<tspan class="{name}">')
+                    current_class = name
+                pieces.append(html.escape(syllable["hanzi"]))
+            if current_class is not None:
+                pieces.append("</tspan>")
+            pieces.append("</text>\n")
+
+            # writes each annotation centered above its hanzi.
+            if annotation is not None:
+                y = baseline - font_size
+                pieces.append(f'<text class="a" y="{y}">')
+                for i, syllable in enumerate(line):
+                    if syllable.is_punct():
+                        continue
+                    x = i * font_size + font_size // 2
+                    name = _class_name(syllable["inflection-num"])
+                    text = html.escape(syllable[annotation])
+                    pieces.append(f'<tspan x="{x}" class="{name}">{text}</tspan>')
+                pieces.append("</text>\n")
+
+            file.write("".join(pieces))
+            line_i += 1
+
+    file.write("</svg>\n")
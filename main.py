@@ -13,10 +13,9 @@ def main():
 
     paragraph = colortones.process_text(text_str)
     scheme = colortones.load_color_scheme("default")
-    print(paragraph.to_color_str(key="hanzi", color_scheme=scheme))
-    print(paragraph.to_color_str(key="pinyin", color_scheme=scheme))
-    print(paragraph.to_color_str(key="zhuyin", color_scheme=scheme))
-    print(paragraph.to_color_str(key="ipa-root", color_scheme=scheme))
+    keys = ["hanzi", "pinyin", "zhuyin", "ipa-root"]
+    for color_str in paragraph.to_color_strs(keys, color_scheme=scheme).values():
+        print(color_str)
 
 
 if __name__ == "__main__":
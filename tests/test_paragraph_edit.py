@@ -0,0 +1,82 @@
+"""
+Filename: test_paragraph_edit.py
+Description: This file checks that editing a Paragraph gives the same
+             Paragraph as processing the new text, over random edits
+             of randomly generated texts.
+
+Author: TravisGK
+Version: 1.0
+
+License: GNU License
+"""
+
+import random
+import pytest
+from colortones import process_text
+
+# the number of random texts edited for each seed.
+NUM_TEXTS = 40
+
+# the number of edits made to each text.
+NUM_EDITS = 8
+
+SEEDS = [0, 1]
+
+PHRASES = [
+    "你好", "我们", "不要", "一样", "谢谢", "老板", "想买", "水果", "听不懂",
+    "很高兴", "认识你", "名字", "今天", "天气", "很好", "明天", "老师", "吃饭",
+    "喝水", "中国", "北京", "一起", "朋友", "工作", "可以", "一点", "东西",
+]  # fmt: skip
+
+# the strings inserted by the edits, which include punctuation,
+# 一 and 不 (whose tones depend on their neighbors) and newlines,
+# such as those typed into an editor.
+PIECES = ["，", "。", "？", "！", "；", " ", "\n", "一", "不", "好", "你好", "不要"]
+PIECES.extend(PHRASES)
+
+KEYS = ["hanzi", "pinyin", "inflection-num", "spoken-tone-num"]
+
+
+def make_text(rng: random.Random):
+    """Returns a random text of up to eight sentences."""
+    sentences = []
+    for _ in range(rng.randint(0, 8)):
+        clauses = [
+            "".join(rng.choice(PHRASES) for _ in range(rng.randint(1, 5)))
+            for _ in range(rng.randint(1, 3))
+        ]
+        sentences.append("，".join(clauses) + rng.choice("。？！"))
+    return "".join(sentences)
+
+
+def get_keys(paragraph):
+    """Returns the keys of every syllable of every word of every sentence."""
+    return [
+        [[tuple(s[k] for k in KEYS) for s in word] for word in sentence]
+        for sentence in paragraph
+    ]
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_edit_matches_process_text(seed):
+    rng = random.Random(seed)
+    for _ in range(NUM_TEXTS):
+        paragraph = process_text(make_text(rng))
+        for _ in range(NUM_EDITS):
+            text_str = paragraph._text_str
+            offset = rng.randrange(len(text_str) + 1)
+            deleted_length = rng.randint(0, min(6, len(text_str) - offset))
+            inserted_str = "".join(rng.choice(PIECES) for _ in range(rng.randint(0, 2)))
+            new_text_str = text_str[:offset] + inserted_str
+            new_text_str += text_str[offset + deleted_length :]
+
+            expected = process_text(new_text_str)
+            paragraph.edit(offset, deleted_length, inserted_str)
+            assert get_keys(paragraph) == get_keys(expected), new_text_str
+
+
+def test_edit_inserts_newline():
+    paragraph = process_text("你好。我们一起去北京。")
+    paragraph.edit(3, 0, "\n")
+    assert get_keys(paragraph) == get_keys(process_text("你好。\n我们一起去北京。"))
+    assert paragraph._text_str == "你好。 我们一起去北京。"
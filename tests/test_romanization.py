@@ -0,0 +1,66 @@
+"""
+Filename: test_romanization.py
+Description: This file checks that words romanized from the table
+             of characters with a single reading are given the same pinyin
+             as pypinyin gives them.
+
+Author: TravisGK
+Version: 1.0
+
+License: GNU License
+"""
+
+import random
+import pytest
+from benchmarks.benchmark import _WORDS
+from colortones._structure._lexicon import (
+    Lexicon,
+    _romanize_monophonic,
+    _romanize_with_pypinyin,
+)
+
+# the number of random characters checked.
+NUM_CHARS = 5000
+
+# the ranges of characters the random characters are taken from:
+# the CJK symbols, the unified ideographs and their first two extensions.
+CHAR_RANGES = [(0x3000, 0x3040), (0x3400, 0x4DC0), (0x4E00, 0xA000), (0x20000, 0x2A6E0)]
+
+# phrases that hold characters with several readings,
+# some of which pypinyin reads differently than the characters alone.
+POLYPHONE_PHRASES = [
+    "东西", "银行", "行长", "长大", "重要", "重新", "音乐", "快乐", "地方",
+    "觉得", "还是", "还有", "朝阳", "睡觉", "好奇", "爱好", "为了", "不了",
+]  # fmt: skip
+
+# words made only of characters with a single reading,
+# along with punctuation, which are romanized without pypinyin.
+MONOPHONIC_WORDS = ["你", "谢谢", "老师", "电影", "，", "。", "？", "！"]
+
+
+def sample_chars():
+    """Returns NUM_CHARS characters taken at random from CHAR_RANGES."""
+    rng = random.Random(0)
+    code_points = [c for start, end in CHAR_RANGES for c in range(start, end)]
+    return [chr(c) for c in rng.sample(code_points, NUM_CHARS)]
+
+
+@pytest.mark.parametrize(
+    "word_str", _WORDS + POLYPHONE_PHRASES + MONOPHONIC_WORDS + sample_chars()
+)
+def test_romanization_matches_pypinyin(word_str):
+    expected = _romanize_with_pypinyin(word_str)
+    p = _romanize_monophonic(word_str)
+    if p is not None:
+        assert p == expected
+    assert Lexicon().romanize(word_str) == expected
+
+
+@pytest.mark.parametrize("word_str", MONOPHONIC_WORDS)
+def test_monophonic_words_skip_pypinyin(word_str):
+    assert _romanize_monophonic(word_str) is not None
+
+
+@pytest.mark.parametrize("word_str", ["我们", "银行", "行长"])
+def test_polyphones_are_given_to_pypinyin(word_str):
+    assert _romanize_monophonic(word_str) is None
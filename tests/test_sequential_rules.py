@@ -0,0 +1,158 @@
+"""
+Filename: test_sequential_rules.py
+Description: This file checks that the flat inflection engine gives the same
+             inflections as the original engine over Lists of Words,
+             on randomly generated clauses.
+
+Author: TravisGK
+Version: 1.0
+
+License: GNU License
+"""
+
+import random
+import pytest
+from colortones._structure._phonetics._inflections import *
+from colortones._structure._syllable import _make_syllable
+from colortones._structure._sequential_rules import (
+    apply_flat_sequential_rule,
+    apply_sequential_rule,
+    flatten_words,
+    inflect_bu,
+    inflect_flat_syllables,
+    inflect_neutrals,
+    inflect_yi,
+    postprocess_flat_inflections,
+)
+
+# the number of random clauses checked for each seed.
+NUM_CLAUSES = 3000
+
+SEEDS = [0, 1, 2]
+
+# (hanzi, pinyin) of syllables that exercise every rule:
+# low and falling tones, 一 and 不 (and what stops them inflecting)
+# and neutral tones, along with punctuation.
+SYLLABLE_POOL = [
+    ("好", "hǎo"),
+    ("买", "mǎi"),
+    ("我", "wǒ"),
+    ("你", "nǐ"),
+    ("是", "shì"),
+    ("看", "kàn"),
+    ("月", "yuè"),
+    ("二", "èr"),
+    ("第", "dì"),
+    ("来", "lái"),
+    ("天", "tiān"),
+    ("一", "yī"),
+    ("一", "yi"),
+    ("不", "bù"),
+    ("不", "bu"),
+    ("的", "de"),
+    ("么", "me"),
+    ("子", "zi"),
+    ("，", "，"),
+]
+
+# the syllables of the pool with a neutral tone.
+# two of these in a row are never generated, since neither engine supports it.
+NEUTRAL_SYLLABLES = {("一", "yi"), ("不", "bu"), ("的", "de"), ("么", "me"), ("子", "zi")}
+NON_NEUTRAL_POOL = [s for s in SYLLABLE_POOL if s not in NEUTRAL_SYLLABLES]
+
+# the rules of the 2-2-3 pattern, as (old inflection, new inflection).
+SEQUENTIAL_RULES = [
+    (LOW_INFLECTION, RISING_LOW_INFLECTION),
+    (FALLING_INFLECTION, HALF_FALLING_INFLECTION),
+]
+
+
+def make_clauses(seed: int):
+    """Yields NUM_CLAUSES random clauses, each as a list of (hanzi, pinyin) words."""
+    rng = random.Random(seed)
+    for _ in range(NUM_CLAUSES):
+        clause = []
+        prev = None
+        for _ in range(rng.randint(1, 12)):
+            word = []
+            for _ in range(rng.choice([1, 1, 1, 2, 2, 3, 4])):
+                pool = SYLLABLE_POOL
+                if prev in NEUTRAL_SYLLABLES:
+                    pool = NON_NEUTRAL_POOL
+                prev = rng.choice(pool)
+                word.append(prev)
+            clause.append(word)
+        yield clause
+
+
+def make_words(clause: list):
+    """Returns a list of new Syllable lists (the Words) of the clause."""
+    return [[_make_syllable(hanzi, pinyin) for hanzi, pinyin in word] for word in clause]
+
+
+def get_marks(words: list):
+    """Returns the inflection and tone mark inflection of every Syllable."""
+    return [[(s.inflection_num, s._marked_num) for s in word] for word in words]
+
+
+def run_or_error(func, words: list):
+    """
+    Returns the marks after calling the function on the Words,
+    or the type of the error it raised, so that both engines
+    must also fail on the same clauses.
+    """
+    try:
+        func(words)
+    except KeyError as e:
+        return type(e)
+    return get_marks(words)
+
+
+def apply_original_rules(words: list):
+    inflect_yi(words)
+    inflect_bu(words)
+    inflect_neutrals(words)
+    for old_inflection, new_inflection in SEQUENTIAL_RULES:
+        apply_sequential_rule(words, old_inflection, new_inflection)
+
+
+def apply_flat_rules(words: list):
+    syllables, word_starts = flatten_words(words)
+    postprocess_flat_inflections(syllables, word_starts)
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+@pytest.mark.parametrize("old_inflection, new_inflection", SEQUENTIAL_RULES)
+def test_flat_sequential_rule(seed, old_inflection, new_inflection):
+    for clause in make_clauses(seed):
+        nested_words = make_words(clause)
+        flat_words = make_words(clause)
+
+        apply_sequential_rule(nested_words, old_inflection, new_inflection)
+        syllables, word_starts = flatten_words(flat_words)
+        apply_flat_sequential_rule(
+            syllables, word_starts, old_inflection, new_inflection
+        )
+        assert get_marks(flat_words) == get_marks(nested_words), clause
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_flat_syllable_scan(seed):
+    def apply_original_passes(words):
+        inflect_yi(words)
+        inflect_bu(words)
+        inflect_neutrals(words)
+
+    def apply_flat_scan(words):
+        inflect_flat_syllables(flatten_words(words)[0])
+
+    for clause in make_clauses(seed):
+        expected = run_or_error(apply_original_passes, make_words(clause))
+        assert run_or_error(apply_flat_scan, make_words(clause)) == expected, clause
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_flat_postprocessing(seed):
+    for clause in make_clauses(seed):
+        expected = run_or_error(apply_original_rules, make_words(clause))
+        assert run_or_error(apply_flat_rules, make_words(clause)) == expected, clause